@@ -1,10 +1,27 @@
+import argparse
+import asyncio
+import queue
 import requests
 import os
 import random
+import re
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+from checkpoint import CHECKPOINT_DIR, Checkpoint
+from classifier import CATEGORIES, CategoryClassifier, canonical_category
+from cleaner import clean_article, clean_draft, clean_headline
+from dedupe import drop_near_duplicates
+from groq_client import AsyncGroqClient
+from history import HistoryStore, normalize_title
+from llm_cache import LLMCache, cache_key
+from ratelimit import RateLimiter, estimate_tokens, retry_after
+from resilience import AUTH_STATUS, CircuitOpenError, GroqError, Resilience
+from sources import TrendCache, build_sources, fetch_trends
+from telemetry import Telemetry
+
 # --- Setup ---
 load_dotenv()
 
@@ -13,18 +30,94 @@ GNEWS_API_KEY = os.getenv("GNEWS_API_KEY")
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 MODEL_NAME = "llama3-70b-8192" #not using this anymore, but keeping for reference
 BACKEND_API_URL = "http://127.0.0.1:8000/api/articles"
+TREND_SOURCES = os.getenv("TREND_SOURCES", "gnews,newsapi")
+TREND_TIMEOUT = float(os.getenv("TREND_TIMEOUT", 10))
+# Cosine similarity above which two trends are the same story, and a trend repeats a used or published headline.
+DEDUPE_THRESHOLD = float(os.getenv("DEDUPE_THRESHOLD", 0.35))
+DEDUPE_SEEN_THRESHOLD = float(os.getenv("DEDUPE_SEEN_THRESHOLD", 0.5))
+# Pipeline stages done in one LLM call instead of several: "angles" (brainstorm + pick + headline)
+# and/or "critics" (humor + style verdicts together), e.g. AGENT_FUSED_STAGES=angles,critics.
+FUSIBLE_STAGES = ("angles", "critics")
+FUSED_STAGES = [stage.strip() for stage in os.getenv("AGENT_FUSED_STAGES", "").split(",") if stage.strip()]
+# "auto": drafts are cleaned by rules (cleaner.py) and only go to the Final Editor when the
+# validator still finds a problem; "always": every draft goes to the Final Editor, as before.
+FINAL_EDITOR_MODE = os.getenv("FINAL_EDITOR_MODE", "auto").lower()
+
+# One limiter for the whole process, so every agent draws on the same Groq/news quotas.
+RATE_LIMITER = RateLimiter.from_env()
+# Retries, backoff and per-model circuit breakers for every Groq call.
+RESILIENCE = Resilience.from_env()
+# Agents with `streams = True` read their answers as they are generated, unless GROQ_STREAM=off.
+STREAMING = os.getenv("GROQ_STREAM", "on").lower() not in ("0", "off", "false", "no")
+# Reasoning-model agents fall back to the fast model when theirs is down, unless GROQ_FALLBACK=off.
+MODEL_FALLBACK = os.getenv("GROQ_FALLBACK", "on").lower() not in ("0", "off", "false", "no")
+
+
+def make_http_session(pool_size=10):
+    """A keep-alive session whose per-host pool can serve `pool_size` concurrent requests."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# One connection pool for every agent, so calls reuse connections instead of reconnecting each time.
+HTTP = make_http_session()
+GROQ_CLIENT = AsyncGroqClient.from_env(GROQ_API_KEY)
+# Reruns after a failure get the stages that already succeeded back from disk instead of paying for them again.
+LLM_CACHE = LLMCache.from_env()
+# Categorizes finished articles locally; the Final Editor only does it when the classifier isn't sure.
+CLASSIFIER = CategoryClassifier.from_env()
+# Spans for every stage and agent invocation, with the time, tokens and cost of their LLM calls.
+TELEMETRY = Telemetry.from_env()
 
 # --- Base Agent ---
 class GroqAgent:
     """The base agent for interacting with the Groq API."""
     # CHANGED: The agent now accepts a specific model name on initialization.
     # We default to the fast model for any agent we don't specify.
-    def __init__(self, model_name="llama-3.1-8b-instant"):
+    # If the model stays unavailable after retries, the call is retried once on `fallback_model`.
+    def __init__(self, model_name="llama-3.1-8b-instant", fallback_model=None):
         self.model = model_name
-
-    # The 'run' method remains the same
-    def run(self, prompt, temperature=0.8, max_tokens=1024, is_json=False):
-        headers = {"Authorization": f"Bearer {GROQ_API_KEY}"}
+        self.fallback_model = fallback_model
+
+    # Agents that write long answers stream them, so a long draft can't hit the read timeout
+    # and its first words arrive early. `stop_when(text_so_far)` ends a stream early.
+    streams = False
+    stop_when = None
+
+    @property
+    def stage(self):
+        """The agent's name in telemetry, e.g. "article_writer" for ArticleWriterAgent."""
+        return re.sub(r"(?<!^)(?=[A-Z])", "_", type(self).__name__.removesuffix("Agent")).lower()
+
+    def run(self, prompt, temperature=0.8, max_tokens=1024, is_json=False, on_token=None, cacheable=None):
+        with TELEMETRY.span(self.stage, model=self.model) as span:
+            result = GROQ_CLIENT.run_sync(TELEMETRY.bind(
+                self.arun(prompt, temperature, max_tokens, is_json, on_token=on_token, cacheable=cacheable)))
+            span.set(ok=result is not None)
+            return result
+
+    def iter_stream(self, prompt, temperature=0.8, max_tokens=1024):
+        """
+        Yields the answer's text piece by piece as it is generated. If a call is retried,
+        the pieces start over.
+        """
+        pieces = queue.Queue()
+        future = GROQ_CLIENT.submit(TELEMETRY.bind(self.arun(prompt, temperature, max_tokens, stream=True, on_token=pieces.put)))
+        future.add_done_callback(lambda _: pieces.put(None))
+        while (piece := pieces.get()) is not None:
+            yield piece
+        future.result()
+
+    async def arun(self, prompt, temperature=0.8, max_tokens=1024, is_json=False, stream=None, on_token=None,
+                   cacheable=None):
+        """
+        Async version of `run`, for callers that are already on an event loop. With
+        `stream` (default: the agent's `streams`), `on_token` gets each piece of text
+        as it arrives. `cacheable(text)` says whether an answer is usable; one that
+        isn't is returned but not cached, so a retry or rerun asks the model again.
+        """
         payload = {
             "model": self.model,
             "messages": [{"role": "user", "content": prompt}],
@@ -33,83 +126,170 @@ class GroqAgent:
         }
         if is_json:
             payload["response_format"] = {"type": "json_object"}
-
+        if stream is None:
+            stream = self.streams and STREAMING
+        if stream:
+            payload["stream"] = True
+            # Groq doesn't stream in JSON mode; the prompt asks for JSON anyway, and callers parse leniently.
+            payload.pop("response_format", None)
+
+        RESILIENCE.count("calls")
         try:
-            response = requests.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=payload, timeout=45)
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"].strip()
-        except Exception as e:
-            print(f"Error calling Groq API: {e}")
+            return await self._complete(payload, estimate_tokens(prompt, max_tokens), on_token, cacheable)
+        except GroqError as e:
+            print(f"Error calling Groq API ({self.model}): {e}")
+            if not self.fallback_model or e.status in AUTH_STATUS:
+                return None
+
+        print(f"↪️ Falling back from {self.model} to {self.fallback_model}")
+        RESILIENCE.count("fallbacks")
+        try:
+            return await self._complete(dict(payload, model=self.fallback_model), estimate_tokens(prompt, max_tokens),
+                                        on_token, cacheable)
+        except GroqError as e:
+            print(f"Error calling Groq API ({self.fallback_model}): {e}")
             return None
 
+    async def _complete(self, payload, reserved, on_token=None, cacheable=None):
+        """One model's answer to `payload`, retrying transient failures; raises GroqError when it gives up."""
+        model = payload["model"]
+        use_cache = LLM_CACHE.applies_to(payload)
+        if use_cache:
+            key = cache_key(payload)
+            cached = LLM_CACHE.get(key)
+            if cached is not None:
+                TELEMETRY.record_call(model, cache_hit=True)
+                if on_token:
+                    on_token(cached)
+                return cached
+
+        scope = f"groq:{model}"
+        breaker = RESILIENCE.breaker(model)
+        for attempt in range(RESILIENCE.max_attempts):
+            if not breaker.allow():
+                RESILIENCE.count("short_circuited")
+                raise CircuitOpenError(model)
+            waited = await RATE_LIMITER.acquire_async(scope, tokens=reserved)
+            try:
+                if payload.get("stream"):
+                    content, usage, finish_reason = await self._read_stream(payload, on_token)
+                else:
+                    response = await GROQ_CLIENT.post(payload)
+                    response.raise_for_status()
+                    data = response.json()
+                    content = data["choices"][0]["message"]["content"].strip()
+                    finish_reason = data["choices"][0].get("finish_reason")
+                    usage = data.get("usage")
+            except Exception as e:
+                error = GroqError.from_exception(e)
+                if breaker.record(ok=not error.model_down):
+                    RESILIENCE.count("circuits_opened")
+                    print(f"🔌 Circuit opened for {model}: failing fast for {breaker.reset_timeout:.0f}s")
+                if not error.retryable:
+                    RESILIENCE.count("fatal")
+                    TELEMETRY.record_call(model, waited)
+                    raise error
+                if attempt == RESILIENCE.max_attempts - 1:
+                    RESILIENCE.count("failures")
+                    TELEMETRY.record_call(model, waited)
+                    raise error
+                RESILIENCE.count("retries")
+                TELEMETRY.record_call(model, waited, retries=1)
+                delay = RESILIENCE.delay(attempt)
+                if error.status == 429:
+                    delay = max(delay, retry_after(error.response))
+                print(f"⏳ Groq call to {model} failed ({error}), retry {attempt + 1} in {delay:.1f}s...")
+                if error.status == 429:
+                    # The limiter makes every caller of this model wait out Retry-After, not just us.
+                    RATE_LIMITER.backoff(scope, delay)
+                else:
+                    await asyncio.sleep(delay)
+                continue
+
+            breaker.record(ok=True)
+            TELEMETRY.record_call(model, waited, usage)
+            RATE_LIMITER.settle(scope, reserved, (usage or {}).get("total_tokens"))
+            # Answers cut off at max_tokens, or that the caller can't use, are not worth replaying.
+            if use_cache and content and finish_reason == "stop" and (cacheable is None or cacheable(content)):
+                LLM_CACHE.put(key, content, model=model)
+            return content
+
+    async def _read_stream(self, payload, on_token=None):
+        """
+        Accumulates a streamed answer; returns (text, usage, finish_reason), stopping early
+        once `stop_when` is satisfied (which counts as a finished answer).
+        """
+        pieces = []
+        usage = None
+        finish_reason = None
+        chunks = GROQ_CLIENT.stream(payload)
+        try:
+            async for chunk in chunks:
+                # Groq reports usage on the last chunk under x_groq; OpenAI-style servers at the top level.
+                usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage") or usage
+                choices = chunk.get("choices") or []
+                finish_reason = (choices[0].get("finish_reason") if choices else None) or finish_reason
+                piece = (choices[0].get("delta") or {}).get("content") if choices else None
+                if not piece:
+                    continue
+                pieces.append(piece)
+                if on_token:
+                    on_token(piece)
+                if self.stop_when and self.stop_when("".join(pieces)):
+                    finish_reason = "stop"
+                    break
+        finally:
+            await chunks.aclose()
+        text = "".join(pieces)
+        if usage is None:
+            # A stream we stopped early never gets to its usage chunk; estimate it like the limiter does.
+            prompt = "".join(message["content"] for message in payload["messages"])
+            usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4}
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        return text.strip(), usage, finish_reason
+
+
+def parse_json_object(text):
+    """The outermost {...} in an LLM answer as a dict, or None if there isn't a valid one."""
+    if not text:
+        return None
+    try:
+        data = json.loads(text[text.find("{"):text.rfind("}") + 1])
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def has_json_keys(*keys):
+    """A `cacheable` check: the answer holds a JSON object with a non-empty value for each of `keys`."""
+    def check(text):
+        data = parse_json_object(text)
+        return data is not None and all(data.get(key) for key in keys)
+    return check
+
+
+def is_approval(text):
+    """True once a critic's answer starts with the bare verdict "Approved"; nothing after it matters."""
+    return re.match(r"\W*approved\b", text, re.IGNORECASE) is not None
+
 # --- Specialized Agents ---
 
 class TrendSpotterAgent:
     #is used to fetch trending news from multiple sources and return a combined list.
     """
     Fetches trending news from all available sources and returns a combined list.
+    Sources come from the registry in sources.py (TREND_SOURCES picks which) and are fetched concurrently.
     """
-    def __init__(self, gnews_key, newsapi_key):
-        self.gnews_key = gnews_key
-        self.newsapi_key = newsapi_key
-        self.sources = []
-        if gnews_key:
-            self.sources.append(self._fetch_from_gnews)
-        if newsapi_key:
-            self.sources.append(self._fetch_from_newsapi)
+    def __init__(self, gnews_key, newsapi_key, source_names=None):
+        names = source_names or [name.strip() for name in TREND_SOURCES.split(",") if name.strip()]
+        self.sources = build_sources(names, api_keys={"gnews": gnews_key, "newsapi": newsapi_key}, timeout=TREND_TIMEOUT)
         if not self.sources:
-            raise ValueError("At least one news API key is required.")
-            
-    # _fetch_from_gnews and _fetch_from_newsapi methods remain the same...
-    def _fetch_from_gnews(self):
-        # is used to fetch trending news from GNews API (India).
-        print("🕵️ Trend-Spotter Agent: Fetching trends and content from GNews (India)...")
-        try:
-            url = f"https://gnews.io/api/v4/top-headlines?country=in&lang=en&token={self.gnews_key}"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            valid_articles = []
-            if "articles" in data:
-                for article in data["articles"]:
-                    title = article.get("title")
-                    content = article.get("content")
-                    if title and content and len(title.split()) > 3:
-                        valid_articles.append({"title": title, "content": content})
-            return valid_articles[:10] if valid_articles else []
-        except Exception as e:
-            print(f"GNews API Error: {e}")
-        return []
+            raise ValueError("At least one news source is required: set a news API key, or TREND_SOURCES=fixture to run offline.")
+        self.cache = TrendCache.from_env()
 
-    def _fetch_from_newsapi(self):
-        # is used to fetch trending news from NewsAPI (US).
-        print("🕵️ Trend-Spotter Agent: Fetching trends and content from NewsAPI (US)...")
-        try:
-            url = f"https://newsapi.org/v2/top-headlines?country=us&apiKey={self.newsapi_key}"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            valid_articles = []
-            if data.get("status") == "ok" and data.get("articles"):
-                for article in data["articles"]:
-                    title = article.get("title")
-                    content = article.get("content") or article.get("description")
-                    if title and content and title != "[Removed]" and len(title.split()) > 3:
-                        valid_articles.append({"title": title, "content": content})
-            return valid_articles[:10] if valid_articles else []
-        except Exception as e:
-            print(f"NewsAPI (US) Error: {e}")
-        return []
+    def run(self):
+        all_articles = fetch_trends(self.sources, HTTP, limiter=RATE_LIMITER, cache=self.cache)
 
-    def run(self):  
-        all_articles = []
-        for source_func in self.sources:
-            # Add a delay between API calls to be safe
-            time.sleep(1) 
-            articles = source_func()
-            if articles:
-                all_articles.extend(articles)
-        
         if all_articles:
             return all_articles
         
@@ -121,8 +301,8 @@ class TrendSpotterAgent:
 
 
 # --- History Management ---
-# This remains a global constant for the file path
-HISTORY_FILE = "used_articles.json"
+# Used headlines, checked by normalized title; see history.py (HISTORY_FILE, HISTORY_TTL_DAYS).
+HISTORY = HistoryStore.from_env()
 #history file is used to track which articles have already been used.
 
 class PotentialAssessorAgent(GroqAgent): #is used to intelligently select a new headline from the available articles.
@@ -131,14 +311,8 @@ class PotentialAssessorAgent(GroqAgent): #is used to intelligently select a new
     handling its own history checking and de-duplication recursively.
     """
     def _load_history(self):
-        """Loads the history of used article titles."""
-        if not os.path.exists(HISTORY_FILE):
-            return []
-        try:
-            with open(HISTORY_FILE, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return []
+        """The history of used article titles; supports `title in history`."""
+        return HISTORY
 
     def _get_llm_choice(self, headlines): #is used to get a single choice from the LLM for a given list of headlines.
         """Gets a single choice from the LLM for a given list of headlines."""
@@ -190,6 +364,56 @@ class PotentialAssessorAgent(GroqAgent): #is used to intelligently select a new
         except (ValueError, TypeError):
             print("⚠️ Assessor returned a non-numeric response. Choosing a new one randomly.")
             return random.choice(available_articles)
+
+    def select(self, all_articles, count):
+        """Picks up to `count` distinct, unused articles for a batch run, best first."""
+        if count == 1:
+            chosen = self.run(all_articles)
+            return [chosen] if chosen else []
+
+        used_headlines = self._load_history()
+        available_articles = []
+        seen = set()
+        for article in all_articles:
+            # Both sources can carry the same story, so titles are de-duplicated too.
+            key = normalize_title(article['title'])
+            if key not in seen and article['title'] not in used_headlines:
+                available_articles.append(article)
+                seen.add(key)
+
+        if not available_articles:
+            print("--- 🛑 Potential-Assessor: No new, unused articles available to choose from.")
+            return []
+        if len(available_articles) <= count:
+            print(f"⚠️ Assessor: Only {len(available_articles)} unused stories available, taking all of them.")
+            return available_articles
+
+        print(f"🧐 Potential-Assessor Agent: Picking {count} of {len(available_articles)} headlines...")
+        formatted_headlines = "\n".join(f"{i+1}. {article['title']}" for i, article in enumerate(available_articles))
+        prompt = f'''
+        You are the head writer for a satirical news show. Your job is to pick the {count} most promising stories to develop from the following list.
+
+        [HEADLINES]
+        {formatted_headlines}
+
+        [INSTRUCTION]
+        Respond with ONLY the numbers of the {count} headlines you choose, best first, separated by commas. For example: 3, 7, 1
+        '''
+        choice_str = super().run(prompt, temperature=0.1, max_tokens=10 + 4 * count)
+
+        chosen = []
+        for number in re.findall(r"\d+", choice_str or ""):
+            index = int(number) - 1
+            if 0 <= index < len(available_articles) and available_articles[index] not in chosen:
+                chosen.append(available_articles[index])
+        chosen = chosen[:count]
+        if len(chosen) < count:
+            print(f"⚠️ Assessor returned {len(chosen)} valid picks. Choosing the rest randomly.")
+            rest = [article for article in available_articles if article not in chosen]
+            chosen.extend(random.sample(rest, count - len(chosen)))
+        for article in chosen:
+            print(f"Coordinator: Assessor selected -> \"{article['title']}\"")
+        return chosen
     
 
 
@@ -276,9 +500,42 @@ class HeadlineWriterAgent(GroqAgent): #is used to craft a satirical headline fro
         prompt = f'Create a satirical news headline in the style of The Onion or Faking News based on this specific angle: "{angle}". Make it absurd but plausible, max 12 words.'
         return super().run(prompt, temperature=0.9, max_tokens=100)
 
+class FusedAngleAgent(GroqAgent):
+    """
+    Brainstorms angles, picks the best one and writes its headline in a single call;
+    stands in for the Angle-Brainstormer, Angle-Evaluator and Headline-Writer.
+    """
+    def run(self, summary):
+        print("🧠 Fused Angle Agent: Brainstorming angles, picking one and writing its headline...")
+        prompt = f'''
+        The following is a clean summary of a real news story: "{summary}"
+
+        You are the head writer of a satirical newspaper in the style of 'The Onion' or 'Faking News'.
+        1. Brainstorm 3 distinct and funny satirical angles for this story.
+        2. Pick the angle with the most originality and comedic potential.
+        3. Write a satirical news headline for that angle. Make it absurd but plausible, max 12 words.
+
+        Return a single, valid JSON object with three keys: "angles" (the list of 3 angles),
+        "best" (the number, 1 to 3, of the angle you picked) and "headline".
+        '''
+        data = parse_json_object(super().run(prompt, temperature=0.8, max_tokens=600, is_json=True,
+                                             cacheable=has_json_keys("angles", "headline")))
+        angles = [angle.strip() for angle in (data or {}).get("angles") or [] if isinstance(angle, str) and angle.strip()]
+        headline = (data or {}).get("headline")
+        if not angles or not isinstance(headline, str) or not headline.strip():
+            print("⚠️ Fused Angle Agent: Answer was missing angles or a headline.")
+            return None
+        best = data.get("best")
+        if not isinstance(best, int) or not 1 <= best <= len(angles):
+            print("⚠️ Fused Angle Agent: Invalid pick. Falling back to the first angle.")
+            best = 1
+        return {"angles": angles, "angle": angles[best - 1], "headline": headline.strip()}
+
 class ArticleWriterAgent(GroqAgent):#is used to write or revise the satirical article.
 
     """Writes or revises the satirical article."""
+    streams = True
+
     def run(self, headline, angle, context, feedback=None):
         if feedback:
             print("🔄 Article-Writer Agent: Revising article based on multi-critic feedback...")
@@ -322,6 +579,9 @@ class ArticleWriterAgent(GroqAgent):#is used to write or revise the satirical ar
 
 class HumorCriticAgent(GroqAgent):
     """A critic that focuses ONLY on the humor and comedic elements."""
+    streams = True
+    stop_when = staticmethod(is_approval)
+
     def run(self, headline, article):
         print("😂 Humor Critic Agent: Reviewing for comedic value...")
         prompt = f'''
@@ -338,6 +598,9 @@ class HumorCriticAgent(GroqAgent):
 
 class StyleCriticAgent(GroqAgent):
     """A critic that focuses ONLY on the journalistic style and tone."""
+    streams = True
+    stop_when = staticmethod(is_approval)
+
     def run(self, headline, article):
         print("👔 Style Critic Agent: Reviewing for tone and structure...")
         # CHANGED: Using a highly structured, forceful prompt to ensure compliance.
@@ -359,12 +622,43 @@ class StyleCriticAgent(GroqAgent):
         '''
         return super().run(prompt, temperature=0.5, max_tokens=200)
 
+class CombinedCriticAgent(GroqAgent):
+    """
+    Gives the humor and the style verdict in a single call, so the draft is sent once
+    per round instead of once per critic.
+    """
+    def run(self, headline, article):
+        print("🎭 Combined Critic Agent: Reviewing for comedic value, tone and structure...")
+        prompt = f'''
+        You review drafts for a satirical newspaper, with two separate verdicts.
+        Headline: "{headline}"
+        Article: "{article}"
+
+        HUMOR: Focus ONLY on the humor. Are the jokes landing? Is the premise funny? Are the quotes witty?
+        Give one sentence of actionable feedback to make it funnier, or the single word "Approved" if the humor needs no improvement.
+        Do NOT comment on style, grammar, or structure here.
+
+        STYLE: Focus ONLY on how to make the TONE more serious, professional, and "deadpan," like a real news report.
+        Give one sentence of actionable feedback, or the single word "Approved".
+        Do NOT critique the humor, the absurdity of the events, or the content itself here.
+
+        Return a single, valid JSON object with two keys, "humor" and "style", each holding its verdict.
+        '''
+        data = parse_json_object(super().run(prompt, temperature=0.5, max_tokens=300, is_json=True,
+                                             cacheable=has_json_keys("humor", "style"))) or {}
+        humor, style = data.get("humor"), data.get("style")
+        return (humor if isinstance(humor, str) else None), (style if isinstance(style, str) else None)
+
 class FinalEditorAgent(GroqAgent):
     """
     Acts as the final gate. It cleans the headline and article, removes all
     AI artifacts, then categorizes the clean text.
     """
-    def run(self, headline, article):
+    streams = True
+
+    def run(self, headline, article, categorize=True):
+        if not categorize:
+            return self.clean(headline, article)
         print("✅ Final Editor Agent: Performing final clean, proofread, and categorization...")
         prompt = f'''
         You are a stern, no-nonsense final copy editor for a satirical newspaper.
@@ -388,31 +682,92 @@ class FinalEditorAgent(GroqAgent):
 
         Return your response as a single, valid JSON object with three keys: "cleaned_headline", "cleaned_article", and "category".
         '''
-        return super().run(prompt, temperature=0.1, max_tokens=2048, is_json=True)
+        return super().run(prompt, temperature=0.1, max_tokens=2048, is_json=True,
+                           cacheable=has_json_keys("cleaned_headline", "cleaned_article"))
 
+    def clean(self, headline, article):
+        """The first two tasks only, for articles that are categorized elsewhere."""
+        print("✅ Final Editor Agent: Performing final clean and proofread...")
+        prompt = f'''
+        You are a stern, no-nonsense final copy editor for a satirical newspaper.
+        Your only goal is to prepare the following for publication.
+
+        Draft Headline: "{headline}"
+        Draft Article: "{article}"
+
+        Perform TWO tasks:
+
+        TASK 1: RUTHLESSLY CLEAN THE HEADLINE.
+        The draft headline may contain extra conversational text or explanations. Extract ONLY the core satirical headline itself. The result should be a short, single-line headline.
+
+        TASK 2: RUTHLESSLY CLEAN THE ARTICLE.
+        The draft may contain AI-generated artifacts, conversational filler, or meta-commentary. You must remove all of it.
+        The final output text for this task MUST be ONLY the publishable article, starting with its dateline and ending with its final sentence.
+
+        Return your response as a single, valid JSON object with two keys: "cleaned_headline" and "cleaned_article".
+        '''
+        return super().run(prompt, temperature=0.1, max_tokens=2048, is_json=True,
+                           cacheable=has_json_keys("cleaned_headline", "cleaned_article"))
+
+class CategorizerAgent(GroqAgent):
+    """Categorizes a clean article the classifier isn't sure about; a one-word answer instead of the editor's full rewrite."""
+    def run(self, headline, article):
+        print("🏷️ Categorizer Agent: Categorizing the article...")
+        prompt = f'''
+        Categorize this satirical news article into ONE of the following options:
+        {", ".join(CATEGORIES)}
 
+        Headline: "{headline}"
+        Article: "{article[:1500]}"
+
+        Respond with ONLY the category name.
+        '''
+        answer = super().run(prompt, temperature=0.1, max_tokens=10)
+        return canonical_category((answer or "").strip().strip(".\"'")) or "General"
+
+
+
+def fetch_published_headlines(limit=100):
+    """The newest published headlines from the backend, or [] if it can't be reached."""
+    try:
+        response = HTTP.get(BACKEND_API_URL, params={"fields": "headline", "limit": limit}, timeout=5)
+        response.raise_for_status()
+        return [article["headline"] for article in response.json()]
+    except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+        print(f"⚠️ Could not load published headlines for de-duplication: {e}")
+        return []
+
+def refresh_classifier(limit=100):
+    """Teaches the category classifier the newest published articles it hasn't seen yet."""
+    try:
+        response = HTTP.get(BACKEND_API_URL, params={"fields": "id,headline,content,category", "limit": limit}, timeout=5)
+        response.raise_for_status()
+        articles = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"⚠️ Could not load published articles for the category classifier: {e}")
+        return
+    learned = CLASSIFIER.update(articles)
+    if learned:
+        CLASSIFIER.save()
+        print(f"🏷️ Classifier: learned from {learned} newly published article(s).")
 
 def save_used_article(headline):
     """Saves a new, successfully used headline to the history file."""
-    history = []
-    if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE, 'r') as f:
-                history = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            history = []
-            
-    if headline not in history:
-        history.append(headline)
-        with open(HISTORY_FILE, 'w') as f:
-            json.dump(history, f, indent=4)
+    if headline not in HISTORY:
+        HISTORY.add(headline)
 
 
 # --- The Orchestrator ---
 
 class Coordinator:
     """Manages the entire multi-agent workflow with specific models for each agent."""
-    def __init__(self):
+    def __init__(self, fused_stages=None):
+        # Stages listed here (see FUSIBLE_STAGES) run as one combined LLM call.
+        self.fused_stages = set(FUSED_STAGES if fused_stages is None else fused_stages)
+        unknown = self.fused_stages - set(FUSIBLE_STAGES)
+        if unknown:
+            raise ValueError(f"Unknown fused stages: {', '.join(sorted(unknown))} (choose from {', '.join(FUSIBLE_STAGES)})")
+
         # Define the models we'll use for clarity
         REASONING_MODEL = "meta-llama/llama-4-maverick-17b-128e-instruct"
         FAST_MODEL = "llama-3.1-8b-instant"
@@ -426,80 +781,175 @@ class Coordinator:
         self.topic_analyzer = TopicAnalysisAgent(model_name=FAST_MODEL)
         self.headline_writer = HeadlineWriterAgent(model_name=FAST_MODEL)
         self.final_editor = FinalEditorAgent(model_name=FAST_MODEL)
+        self.categorizer = CategorizerAgent(model_name=FAST_MODEL)
+
+        # Agents for high-quality reasoning and creativity use the REASONING_MODEL,
+        # dropping to the FAST_MODEL if the reasoning model is unavailable.
+        fallback = FAST_MODEL if MODEL_FALLBACK else None
+        self.potential_assessor = PotentialAssessorAgent(model_name=REASONING_MODEL, fallback_model=fallback)
+        self.angle_brainstormer = AngleBrainstormerAgent(model_name=REASONING_MODEL, fallback_model=fallback)
+        self.angle_evaluator = AngleEvaluatorAgent(model_name=REASONING_MODEL, fallback_model=fallback)
+        self.article_writer = ArticleWriterAgent(model_name=REASONING_MODEL, fallback_model=fallback)
+        self.humor_critic = HumorCriticAgent(model_name=REASONING_MODEL, fallback_model=fallback)
+        self.style_critic = StyleCriticAgent(model_name=REASONING_MODEL, fallback_model=fallback)
+        self.fused_angle = FusedAngleAgent(model_name=REASONING_MODEL, fallback_model=fallback)
+        self.combined_critic = CombinedCriticAgent(model_name=REASONING_MODEL, fallback_model=fallback)
+
+
+    def screen_trends(self, all_trends):
+        """Drops repeats of the same story, and stories already used or published, before any of them costs an LLM call."""
+        seen_headlines = HISTORY.titles() + fetch_published_headlines()
+        kept, dropped = drop_near_duplicates(all_trends, seen_headlines, DEDUPE_THRESHOLD, DEDUPE_SEEN_THRESHOLD)
+        for trend, reason in dropped:
+            print(f"🧹 Dedupe: skipping \"{trend['title']}\" ({reason})")
+        print(f"Coordinator: {len(kept)} of {len(all_trends)} trends are distinct, new stories.")
+        return kept
+
+    def run_critics(self, headline, article):
+        """Runs the humor and style critics concurrently; they only read the same draft."""
+        if "critics" in self.fused_stages:
+            return self.combined_critic.run(headline, article)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            humor = pool.submit(TELEMETRY.carry(self.humor_critic.run), headline, article)
+            style = pool.submit(TELEMETRY.carry(self.style_critic.run), headline, article)
+            return humor.result(), style.result()
+
+    def find_trends(self):
+        """Fetches trends from every source and screens out repeats."""
+        with TELEMETRY.span("trend_spotter"):
+            all_trends = self.trend_spotter.run() #is used to fetch trending news from multiple sources and return a combined list.
+        if not all_trends:
+            return all_trends
+        with TELEMETRY.span("dedupe"):
+            return self.screen_trends(all_trends)
+
+    def run(self, max_revisions=2, checkpoint=None):
+        with TELEMETRY.span("run"):
+            return self._run(max_revisions, checkpoint)
+
+    def _run(self, max_revisions=2, checkpoint=None):
+        print("\n--- 🎬 Coordinator: Starting Autonomous Assessor Workflow ---\n")
+        checkpoint = checkpoint or Checkpoint()
 
-        # Agents for high-quality reasoning and creativity use the REASONING_MODEL
-        self.potential_assessor = PotentialAssessorAgent(model_name=REASONING_MODEL)
-        self.angle_brainstormer = AngleBrainstormerAgent(model_name=REASONING_MODEL)
-        self.angle_evaluator = AngleEvaluatorAgent(model_name=REASONING_MODEL)
-        self.article_writer = ArticleWriterAgent(model_name=REASONING_MODEL)
-        self.humor_critic = HumorCriticAgent(model_name=REASONING_MODEL)
-        self.style_critic = StyleCriticAgent(model_name=REASONING_MODEL)
+        selected_trend = checkpoint.get("trend")
+        if not selected_trend:
+            # Step 1: Get all possible trends from all sources
+            all_trends = self.find_trends()
+            if not all_trends: return None, None, None
 
+            # Step 2: Let the autonomous assessor handle selection and de-duplication
+            # The Coordinator's logic is now much simpler.
+            selected_trend = self.potential_assessor.run(all_trends)
 
-    def run(self, max_revisions=2):
-        print("\n--- 🎬 Coordinator: Starting Autonomous Assessor Workflow ---\n")
+            if not selected_trend:
+                print("--- 🛑 Coordinator: Assessor could not provide a suitable trend. Aborting. ---")
+                return None, None, None
+            checkpoint.save("trend", selected_trend)
 
-        # Step 1: Get all possible trends from all sources
-        all_trends = self.trend_spotter.run() #is used to fetch trending news from multiple sources and return a combined list.
-        if not all_trends: return None, None, None
-        time.sleep(2)  # Add delay
+        return self.write_article(selected_trend, max_revisions, checkpoint)
 
-        # Step 2: Let the autonomous assessor handle selection and de-duplication
-        # The Coordinator's logic is now much simpler.
-        selected_trend = self.potential_assessor.run(all_trends)
-        time.sleep(2) # Add delay
-        
-        if not selected_trend:
-            print("--- 🛑 Coordinator: Assessor could not provide a suitable trend. Aborting. ---")
-            return None, None, None
-            
+    def run_batch(self, count, concurrency=1, max_revisions=2, checkpoint=None):
+        """
+        Produces up to `count` articles from one trend fetch, running `concurrency`
+        article pipelines at once. Returns the (headline, article, category) of each success.
+        """
+        with TELEMETRY.span("batch", count=count, concurrency=concurrency):
+            return self._run_batch(count, concurrency, max_revisions, checkpoint)
+
+    def _run_batch(self, count, concurrency=1, max_revisions=2, checkpoint=None):
+        print(f"\n--- 🎬 Coordinator: Starting batch of {count} article(s), {concurrency} at a time ---\n")
+        checkpoint = checkpoint or Checkpoint()
+
+        stories = checkpoint.get("stories")
+        if not stories:
+            all_trends = self.find_trends()
+            if not all_trends:
+                print("--- 🛑 Coordinator: No new stories to write about. Aborting. ---")
+                return []
+
+            stories = self.potential_assessor.select(all_trends, count)
+            if not stories:
+                print("--- 🛑 Coordinator: Assessor could not provide any suitable trends. Aborting. ---")
+                return []
+            checkpoint.save("stories", stories)
+
+        started = time.perf_counter()
+        def write(index, story):
+            article_checkpoint = checkpoint.scope(f"article{index}")
+            if article_checkpoint.get("submitted"):
+                print(f"⏩ Checkpoint: article{index} of run {checkpoint.run_id} was already submitted, skipping it")
+                return None, None, None
+            with TELEMETRY.span("article", index=index):
+                return self.write_article(story, max_revisions, article_checkpoint)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(TELEMETRY.carry(write), index, story) for index, story in enumerate(stories)]
+            results = [future.result() for future in futures]
+        finished = [result for result in results if all(result)]
+        print(f"--- 🏁 Coordinator: {len(finished)}/{len(stories)} article(s) finished in {time.perf_counter() - started:.1f}s ---")
+        return finished
+
+    def write_article(self, selected_trend, max_revisions=2, checkpoint=None):
+        """
+        Takes one selected trend through analysis, writing, critique and final editing.
+        Each stage's output goes to `checkpoint`, and stages it already holds are skipped.
+        """
+        checkpoint = checkpoint or Checkpoint()
         trend_title = selected_trend['title']
         trend_content = selected_trend['content']
         print(f'Coordinator: Proceeding with trend -> "{trend_title}"\n')
         
         # Step 3: Summarize the real content to get a clean context
         context_source = trend_content if trend_content else trend_title
-        clean_summary = self.topic_analyzer.run(context_source)
+        clean_summary = checkpoint.stage("summary", lambda: self.topic_analyzer.run(context_source))
         if not clean_summary:
             print("Coordinator: Summarizer failed, falling back to raw content/title.")
             clean_summary = context_source
         print(f'Coordinator: Using clean summary as context -> "{clean_summary}"\n')
-        time.sleep(2)
-
-        # Step 4: Brainstorm Angles
-        angles_text = self.angle_brainstormer.run(clean_summary)
-        # ... (error handling) ...
-        angles = [line.split('.', 1)[-1].strip() for line in angles_text.split('\n') if '.' in line]
-        if not angles: return None, None, None
-        time.sleep(2)
-
-        # ⭐️ NEW Step 4.5: Intelligently Evaluate and Select the Best Angle
-        # angle = random.choice(angles) # <-- This is what we are replacing
-        angle = self.angle_evaluator.run(summary=clean_summary, angles=angles)
-        if not angle: 
-            print("--- 🛑 Coordinator: Angle Evaluator failed. Aborting. ---")
-            return None, None, None
-        print(f'Coordinator: Chosen angle -> "{angle}"\n')
-        time.sleep(2)
 
-        # Step 5: Write Headline
-        headline = self.headline_writer.run(angle)
-        if not headline: return None, None, None
-        print(f'Coordinator: Generated headline -> "{headline}"\n')
-        time.sleep(2)
+        if "angles" in self.fused_stages:
+            # Steps 4-5 in one call
+            plan = checkpoint.stage("angle_plan", lambda: self.fused_angle.run(clean_summary))
+            if not plan:
+                print("--- 🛑 Coordinator: Fused Angle Agent failed. Aborting. ---")
+                return None, None, None
+            angle, headline = plan["angle"], plan["headline"]
+            print(f'Coordinator: Chosen angle -> "{angle}"\n')
+            print(f'Coordinator: Generated headline -> "{headline}"\n')
+        else:
+            # Step 4: Brainstorm Angles
+            angles_text = checkpoint.stage("angles", lambda: self.angle_brainstormer.run(clean_summary))
+            if not angles_text: return None, None, None
+            angles = [line.split('.', 1)[-1].strip() for line in angles_text.split('\n') if '.' in line]
+            if not angles: return None, None, None
+
+            # ⭐️ NEW Step 4.5: Intelligently Evaluate and Select the Best Angle
+            # angle = random.choice(angles) # <-- This is what we are replacing
+            angle = checkpoint.stage("angle", lambda: self.angle_evaluator.run(summary=clean_summary, angles=angles))
+            if not angle: 
+                print("--- 🛑 Coordinator: Angle Evaluator failed. Aborting. ---")
+                return None, None, None
+            print(f'Coordinator: Chosen angle -> "{angle}"\n')
+
+            # Step 5: Write Headline
+            headline = checkpoint.stage("headline", lambda: self.headline_writer.run(angle))
+            if not headline: return None, None, None
+            print(f'Coordinator: Generated headline -> "{headline}"\n')
 
         # Step 6: Write First Draft
-        article = self.article_writer.run(headline, angle=angle, context=clean_summary)
+        article = checkpoint.stage("draft0", lambda: self.article_writer.run(headline, angle=angle, context=clean_summary))
         if not article: return None, None, None
-        time.sleep(2)
 
         # Step 7: Multi-Critic Revision Loop
         for i in range(max_revisions):
             print(f"--- Conducting critique round {i+1}/{max_revisions} ---")
-            humor_feedback = self.humor_critic.run(headline, article)
-            time.sleep(2)
-            style_feedback = self.style_critic.run(headline, article)
-            time.sleep(2)
+            round_started = time.perf_counter()
+            # Only a round where both critics answered is worth keeping.
+            with TELEMETRY.span("critique_round", round=i + 1):
+                humor_feedback, style_feedback = checkpoint.stage(
+                    f"critiques{i+1}", lambda: self.run_critics(headline, article), keep=all
+                )
+            print(f"Coordinator: Critique round {i+1} took {time.perf_counter() - round_started:.1f}s")
             print(f'Coordinator: Humor Critic says -> "{humor_feedback}"')
             print(f'Coordinator: Style Critic says -> "{style_feedback}"\n')
 
@@ -520,66 +970,151 @@ class Coordinator:
             
             revision_prompt = " ".join(combined_feedback)
             print(f"Coordinator: Revision {i+1}/{max_revisions}. Sending back to writer.")
-            article = self.article_writer.run(headline, angle=angle, context=clean_summary, feedback=revision_prompt)
+            article = checkpoint.stage(
+                f"draft{i+1}",
+                lambda: self.article_writer.run(headline, angle=angle, context=clean_summary, feedback=revision_prompt),
+            )
             if not article: return None, None, None
-            time.sleep(2)
         
         # Step 8: Final Polish and Categorization
-        editor_json_response = self.final_editor.run(headline, article)
+        final = checkpoint.stage("final", lambda: self.final_edit(headline, article))
+        if not final:
+            return None, None, None
+        final_headline, final_article, final_category = final
+
+        # On success, the Coordinator triggers the save.
+        save_used_article(trend_title)
+        print(f"Coordinator: Successfully saved '{trend_title}' to history.")
+
+        print(f"Coordinator: Final publishable article generated and categorized as '{final_category}'.")
+        return final_headline, final_article, final_category
+
+    def final_edit(self, headline, article):
+        """
+        Cleans the draft by rule and returns (headline, article, category); the Final Editor
+        only runs if the cleaned draft still fails validation. None if its answer is unusable.
+        """
+        headline, article, problems = clean_draft(headline, article)
+        # The draft is close enough to the cleaned article for the classifier; only if it
+        # isn't confident does an LLM categorize as well.
+        category, confidence = CLASSIFIER.predict(headline, article)
+        if category:
+            print(f"🏷️ Classifier: '{category}' ({confidence:.0%} confident).")
+        elif CLASSIFIER.trained:
+            print(f"🏷️ Classifier: not confident enough ({confidence:.0%}), leaving the category to the LLM.")
+
+        if FINAL_EDITOR_MODE != "always" and not problems:
+            print("🧽 Cleaner: draft is publishable as cleaned, skipping the Final Editor.")
+            return headline, article, category or self.categorizer.run(headline, article)
+        if problems:
+            print(f"🧽 Cleaner: {'; '.join(problems)}. Sending the draft to the Final Editor.")
+
+        editor_json_response = self.final_editor.run(headline, article, categorize=category is None)
         if not editor_json_response:
             print("--- 🛑 Coordinator: Final Editor failed. Aborting workflow. ---")
-            return None, None, None
+            return None
 
         try:
-            editor_data = json.loads(editor_json_response)
-            final_headline = editor_data.get("cleaned_headline")
-            final_article = editor_data.get("cleaned_article")
-            final_category = editor_data.get("category", "General")
+            # Streamed answers come without JSON mode, so allow for text around the object.
+            editor_data = json.loads(editor_json_response[editor_json_response.find("{"):editor_json_response.rfind("}") + 1])
+            final_headline = clean_headline(editor_data.get("cleaned_headline"))
+            final_article = clean_article(editor_data.get("cleaned_article"), final_headline)
+            final_category = category or editor_data.get("category", "General")
 
             if not final_article or not final_headline:
                  print("--- 🛑 Coordinator: Final Editor returned no article or headline. Aborting. ---")
-                 return None, None, None
-
-            # On success, the Coordinator triggers the save.
-            save_used_article(trend_title)
-            print(f"Coordinator: Successfully saved '{trend_title}' to history.")
-            
-            print(f"Coordinator: Final publishable article generated and categorized as '{final_category}'.")
+                 return None
             return final_headline, final_article, final_category
 
         except json.JSONDecodeError:
             print(f"--- 🛑 Coordinator: Failed to decode JSON from Final Editor. Response was: {editor_json_response} ---")
-            return None, None, None
+            return None
         
 
+DISCLAIMER = (
+    "\n\n---\n"
+    "**Disclaimer:** This article is a work of satire and is entirely fictional. It is not intended to be taken as a factual account. "
+    "Any resemblance to actual events, locales, or persons, living or dead, is purely coincidental."
+)
+
 def submit_article_to_backend(headline, content, category):
     """Submits the final article to the backend with a disclaimer."""
-    print("\n--- 📤 Submitting final article to the web app backend ---")
-    disclaimer = (
-        "\n\n---\n"
-        "**Disclaimer:** This article is a work of satire and is entirely fictional. It is not intended to be taken as a factual account. "
-        "Any resemblance to actual events, locales, or persons, living or dead, is purely coincidental."
-    )
-    final_content_with_disclaimer = content + disclaimer
-    article_data = {
-        "headline": headline,
-        "content": final_content_with_disclaimer,
-        "author": "AI Agent Team",
-        "category": category,
-    }
+    return submit_articles_to_backend([(headline, content, category)])
+
+def submit_articles_to_backend(articles):
+    """
+    Submits several (headline, content, category) articles to the backend in one batch
+    request; returns their new ids in the same order, or None if the submission failed.
+    """
+    print(f"\n--- 📤 Submitting {len(articles)} final article(s) to the web app backend ---")
+    articles_data = [
+        {
+            "headline": headline,
+            "content": content + DISCLAIMER,
+            "author": "AI Agent Team",
+            "category": category,
+        }
+        for headline, content, category in articles
+    ]
     try:
-        response = requests.post(BACKEND_API_URL, json=article_data, timeout=15)
+        response = HTTP.post(f"{BACKEND_API_URL}:batch", json=articles_data, timeout=15)
         response.raise_for_status()
-        print("✅ Success! The new article is now a draft in your admin panel.")
+        print(f"✅ Success! {len(articles)} new article(s) are now drafts in your admin panel.")
+        return [result["id"] for result in response.json()["results"]]
     except requests.exceptions.RequestException as e:
-        print(f"❌ Error submitting article to backend: {e}")
+        print(f"❌ Error submitting articles to backend: {e}")
+        return None
 
 # --- Main Execution Block ---
 if __name__ == "__main__":
-    coordinator = Coordinator()
-    final_headline, final_article, final_category = coordinator.run()
-
-    if final_headline and final_article and final_category:
-        submit_article_to_backend(final_headline, final_article, final_category)
+    parser = argparse.ArgumentParser(description="Runs the AI newsroom and submits the finished articles as drafts.")
+    parser.add_argument("--count", type=int, default=1, help="number of articles to produce in this run")
+    parser.add_argument("--concurrency", type=int, default=1, help="number of article pipelines to run at once")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and don't fill the LLM response cache")
+    parser.add_argument("--resume", metavar="RUN_ID", help="continue a failed run from its checkpoint")
+    parser.add_argument("--fuse", metavar="STAGES",
+                        help=f"comma-separated stages to run as one LLM call each ({', '.join(FUSIBLE_STAGES)}); "
+                             "overrides AGENT_FUSED_STAGES")
+    args = parser.parse_args()
+    if args.no_cache:
+        LLM_CACHE.enabled = False
+
+    if args.resume:
+        try:
+            checkpoint = Checkpoint.resume(args.resume)
+        except FileNotFoundError:
+            raise SystemExit(f"🛑 No checkpoint found for run '{args.resume}' in {CHECKPOINT_DIR}/")
+        stories = checkpoint.get("stories") or []
+        # Checkpoints from before submission was recorded per article mark the whole run instead.
+        if checkpoint.get("submitted") or (
+                stories and all(checkpoint.scope(f"article{i}").get("submitted") for i in range(len(stories)))):
+            raise SystemExit(f"✅ Run {args.resume} already finished and was submitted. Nothing to resume.")
+    else:
+        checkpoint = Checkpoint(directory=CHECKPOINT_DIR)
+    print(f"💾 Run {checkpoint.run_id}: if it fails, continue it with --resume {checkpoint.run_id}")
+    TELEMETRY.start(checkpoint.run_id)
+    refresh_classifier()
+
+    fused_stages = [stage.strip() for stage in args.fuse.split(",") if stage.strip()] if args.fuse is not None else None
+    coordinator = Coordinator(fused_stages)
+    coordinator.run_batch(args.count, concurrency=max(1, args.concurrency), checkpoint=checkpoint)
+
+    # Submission is recorded per article, so resuming a partly failed batch finishes and
+    # submits only the articles that weren't submitted yet.
+    pending = [checkpoint.scope(f"article{i}") for i in range(len(checkpoint.get("stories") or []))]
+    pending = [article for article in pending if article.get("final") and not article.get("submitted")]
+    if pending:
+        with TELEMETRY.span("submit"):
+            article_ids = submit_articles_to_backend([tuple(article.get("final")) for article in pending])
+        for article, article_id in zip(pending, article_ids or []):
+            article.save("submitted", article_id)
     else:
-        print("\n--- 🛑 Workflow failed. No article was submitted. ---")
\ No newline at end of file
+        print("\n--- 🛑 Workflow failed. No article was submitted. ---")
+
+    if LLM_CACHE.enabled:
+        stats = LLM_CACHE.stats()
+        print(f"🗃️ LLM cache: {stats['hits']} hits, {stats['misses']} misses, {stats['bypassed']} bypassed, {stats['evictions']} evicted")
+    stats = RESILIENCE.stats()
+    print(f"🛟 Groq calls: {stats['calls']} calls, {stats['retries']} retries, {stats['fallbacks']} fallbacks, "
+          f"{stats['failures'] + stats['fatal']} failed, {stats['short_circuited']} short-circuited, circuits {stats['circuits']}")
+    TELEMETRY.finish()
@@ -0,0 +1,139 @@
+"""
+Runs the whole newsroom pipeline offline, N times, against fake_groq.py and the
+fixture news source, and reports throughput plus p50/p95 latency per stage.
+
+    python bench_pipeline.py --runs 5 --count 3 --concurrency 3 --latency 0.3 --token-rate 400
+    python bench_pipeline.py --runs 5 --output before.json
+    python bench_pipeline.py --runs 5 --baseline before.json   # flags regressions
+    python bench_pipeline.py --runs 5 --fuse angles,critics --baseline before.json
+
+Rate limits are off unless --real-limits is given, so the numbers show the pipeline
+itself; --throttle-every N makes the fake server answer every Nth request with a 429.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from fake_groq import start_fake_server
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def compare(results, baseline, tolerance):
+    """Lines describing every stage whose p95, and the throughput, that got worse than `baseline` by more than `tolerance`."""
+    regressions = []
+    if results["articles/min"] < baseline.get("articles/min", 0) * (1 - tolerance):
+        regressions.append(f"throughput: {baseline['articles/min']:.1f} → {results['articles/min']:.1f} articles/min")
+    for stage, row in results["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if before and row["p95 s"] > before["p95 s"] * (1 + tolerance) + 0.01:
+            regressions.append(f"{stage}: p95 {before['p95 s']:.2f} → {row['p95 s']:.2f} s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--count", type=int, default=1, help="articles per run")
+    parser.add_argument("--concurrency", type=int, default=1, help="article pipelines at once within a run")
+    parser.add_argument("--max-revisions", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake server: mean seconds per completion")
+    parser.add_argument("--token-rate", type=float, default=400, help="fake server: completion tokens per second")
+    parser.add_argument("--throttle-every", type=int, default=0, help="fake server: answer every Nth request with a 429")
+    parser.add_argument("--retry-after", type=float, default=1)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake server: fraction of requests answered with a 503")
+    parser.add_argument("--fuse", default="", metavar="STAGES", help="stages to fuse into one call each, e.g. angles,critics")
+    parser.add_argument("--no-stream", action="store_true", help="request whole responses instead of streams")
+    parser.add_argument("--real-limits", action="store_true", help="keep the default (or AGENT_RATE_LIMITS) rate limits")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    server = start_fake_server(latency=args.latency, token_rate=args.token_rate, throttle_every=args.throttle_every,
+                               retry_after=args.retry_after, error_rate=args.error_rate)
+    workdir = tempfile.mkdtemp(prefix="bench-pipeline-")
+    # The agent module reads its configuration at import time.
+    os.environ.update(
+        GROQ_BASE_URL=server.base_url, GROQ_API_KEY="bench", TREND_SOURCES="fixture", TREND_CACHE_TTL="0",
+        LLM_CACHE="off", GROQ_STREAM="off" if args.no_stream else "on",
+        HISTORY_FILE=os.path.join(workdir, "history.jsonl"),
+    )
+    import agent
+    from history import HistoryStore
+    from ratelimit import RateLimiter
+    from telemetry import Telemetry
+    if not args.real_limits:
+        agent.RATE_LIMITER = RateLimiter({})
+
+    fused_stages = [stage.strip() for stage in args.fuse.split(",") if stage.strip()]
+    durations = {}
+    run_times, finished = [], 0
+    calls = tokens = 0
+    for run in range(args.runs):
+        # A fresh history each run, or the fixture stories would count as already used.
+        agent.HISTORY = HistoryStore(os.path.join(workdir, f"history{run}.jsonl"), legacy_path=None)
+        agent.TELEMETRY = Telemetry(directory=None)
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        started = time.perf_counter()
+        with output:
+            articles = agent.Coordinator(fused_stages).run_batch(args.count, args.concurrency, args.max_revisions)
+        run_times.append(time.perf_counter() - started)
+        finished += len(articles)
+        for span in agent.TELEMETRY.spans:
+            durations.setdefault(span.name, []).append(span.duration)
+            calls += span.attributes.get("calls", 0)
+            tokens += span.attributes.get("prompt_tokens", 0) + span.attributes.get("completion_tokens", 0)
+        print(f"Run {run + 1}/{args.runs}: {len(articles)}/{args.count} article(s) in {run_times[-1]:.2f}s", file=sys.stderr)
+
+    total = sum(run_times)
+    results = {
+        "articles/min": finished / total * 60 if total else 0.0,
+        "finished": finished,
+        "runs": args.runs,
+        "run p50 s": percentile(run_times, 0.50),
+        "run p95 s": percentile(run_times, 0.95),
+        "requests/article": calls / max(finished, 1),
+        "tokens/article": tokens / max(finished, 1),
+        "stages": {
+            stage: {"n": len(values), "p50 s": percentile(values, 0.50), "p95 s": percentile(values, 0.95),
+                    "mean s": statistics.fmean(values)}
+            for stage, values in durations.items()
+        },
+        "server": dict(server.stats),
+    }
+
+    print(f"\n{'stage':<20}{'n':>5}{'p50 s':>9}{'p95 s':>9}{'mean s':>9}")
+    for stage, row in sorted(results["stages"].items(), key=lambda item: -item[1]["p95 s"]):
+        print(f"{stage:<20}{row['n']:>5}{row['p50 s']:>9.2f}{row['p95 s']:>9.2f}{row['mean s']:>9.2f}")
+    print(f"\n{finished}/{args.runs * args.count} articles in {total:.1f}s: {results['articles/min']:.1f} articles/min, "
+          f"run p50 {results['run p50 s']:.2f}s / p95 {results['run p95 s']:.2f}s, "
+          f"{results['requests/article']:.1f} LLM requests and {results['tokens/article']:.0f} tokens per article")
+    print(f"Fake server: {server.stats}")
+
+    server.shutdown()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"⚠️ Regression: {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
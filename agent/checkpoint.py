@@ -0,0 +1,63 @@
+import copy
+import json
+import os
+import threading
+import time
+import uuid
+
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", ".checkpoints")
+
+
+class Checkpoint:
+    """
+    Stage outputs of one run (selected trend, summary, angles, headline, drafts,
+    critiques, ...), written to `<directory>/<run_id>.json` after every stage, so a
+    failed run can be resumed without redoing the LLM work that already succeeded.
+
+    Without a directory the outputs are only kept in memory.
+    """
+    def __init__(self, run_id=None, directory=None):
+        self.run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.path = os.path.join(directory, f"{self.run_id}.json") if directory else None
+        self._data = {}
+        self._lock = threading.Lock()
+        self._prefix = ""
+
+    @classmethod
+    def resume(cls, run_id, directory=CHECKPOINT_DIR):
+        """Loads an earlier run's checkpoint; raises FileNotFoundError if there is none."""
+        checkpoint = cls(run_id, directory)
+        with open(checkpoint.path) as f:
+            checkpoint._data = json.load(f)
+        return checkpoint
+
+    def scope(self, prefix):
+        """A view whose stages are stored under `prefix/`, e.g. one per article in a batch."""
+        child = copy.copy(self)  # shares the data, lock and file
+        child._prefix = f"{self._prefix}{prefix}/"
+        return child
+
+    def get(self, name):
+        with self._lock:
+            return self._data.get(self._prefix + name)
+
+    def save(self, name, value):
+        with self._lock:
+            self._data[self._prefix + name] = value
+            if self.path:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self._data, f, indent=2)
+                os.replace(tmp_path, self.path)
+
+    def stage(self, name, compute, keep=lambda value: value is not None):
+        """Returns the stored output of `name`, or runs `compute()` and stores its result if `keep(result)`."""
+        value = self.get(name)
+        if value is not None:
+            print(f"⏩ Checkpoint: reusing '{self._prefix}{name}' from run {self.run_id}")
+            return value
+        value = compute()
+        if keep(value):
+            self.save(name, value)
+        return value
@@ -0,0 +1,255 @@
+"""
+A local category classifier for finished articles: TF-IDF features and a softmax
+(multinomial logistic regression) model in NumPy, trained on the newsroom's own
+labeled articles and saved to disk. The pipeline only asks the LLM to categorize
+when it isn't confident enough.
+
+    python classifier.py train                # from ../backend/database.json
+    python classifier.py update               # adds articles it hasn't seen yet
+    python classifier.py evaluate             # leave-one-out accuracy and coverage
+    python classifier.py predict "Headline" "Article text..."
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from dedupe import TITLE_WEIGHT, terms
+
+CATEGORIES = ["Politics", "World News", "Business", "Technology", "Sports", "Entertainment", "Lifestyle", "Science"]
+# Labels older articles were stored under.
+ALIASES = {"tech": "Technology", "world": "World News", "world news": "World News"}
+
+AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASE_FILE = os.path.join(AGENT_DIR, "..", "backend", "database.json")
+
+
+def canonical_category(label):
+    """The CATEGORIES entry `label` stands for, or None (e.g. for "General")."""
+    label = (label or "").strip().lower()
+    for category in CATEGORIES:
+        if category.lower() == label:
+            return category
+    return ALIASES.get(label)
+
+
+def article_terms(headline, content):
+    return terms(headline) * TITLE_WEIGHT + terms(content)
+
+
+def labeled_examples(articles):
+    """(id, terms, class index) for every article with a usable category and text."""
+    examples = []
+    for article in articles:
+        category = canonical_category(article.get("category"))
+        if category and article.get("content"):
+            article_id = article.get("id") or article.get("headline")
+            examples.append((article_id, article_terms(article.get("headline"), article["content"]),
+                             CATEGORIES.index(category)))
+    return examples
+
+
+def load_database(path=DATABASE_FILE):
+    """The articles in the backend's database snapshot."""
+    with open(path) as f:
+        return json.load(f).get("articles", [])
+
+
+class CategoryClassifier:
+    """
+    Softmax regression over L2-normalized TF-IDF vectors (headline terms weighted
+    up, like the dedupe vectors). Documents are kept sparse as (indptr, indices,
+    values) arrays, so scoring and gradients are a gather and a scatter-add.
+
+    `update()` learns from articles it hasn't seen, warm-starting from the current
+    weights; the vocabulary and document frequencies grow with it.
+    """
+    def __init__(self, path="category_model.npz", min_confidence=0.6, learning_rate=1.0, l2=1e-4, epochs=300):
+        self.path = path
+        self.min_confidence = min_confidence
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.epochs = epochs
+        self._reset()
+
+    def _reset(self):
+        self.vocabulary = {}
+        self.document_frequency = np.zeros(0, dtype=np.float32)
+        self.documents = 0
+        self.weights = np.zeros((0, len(CATEGORIES)), dtype=np.float32)
+        self.bias = np.zeros(len(CATEGORIES), dtype=np.float32)
+        self.trained_ids = set()
+
+    @classmethod
+    def from_env(cls):
+        """Reads CLASSIFIER_MODEL and CLASSIFIER_MIN_CONFIDENCE, and loads the saved model if there is one."""
+        classifier = cls(os.getenv("CLASSIFIER_MODEL", "category_model.npz"),
+                         float(os.getenv("CLASSIFIER_MIN_CONFIDENCE", 0.6)))
+        classifier.load()
+        return classifier
+
+    @property
+    def trained(self):
+        return bool(self.trained_ids)
+
+    def _grow(self, documents):
+        """Adds the documents' new terms to the vocabulary and counts them into the document frequencies."""
+        for document in documents:
+            for term in set(document):
+                if term not in self.vocabulary:
+                    self.vocabulary[term] = len(self.vocabulary)
+        extra = len(self.vocabulary) - len(self.document_frequency)
+        if extra:
+            self.document_frequency = np.concatenate([self.document_frequency, np.zeros(extra, dtype=np.float32)])
+            self.weights = np.vstack([self.weights, np.zeros((extra, len(CATEGORIES)), dtype=np.float32)])
+        for document in documents:
+            self.document_frequency[[self.vocabulary[term] for term in set(document)]] += 1
+        self.documents += len(documents)
+
+    def _vectorize(self, documents):
+        """Sparse TF-IDF rows for `documents` over the known vocabulary (unknown terms are ignored)."""
+        indptr, indices, counts = [0], [], []
+        for document in documents:
+            row = {}
+            for term in document:
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    row[column] = row.get(column, 0) + 1
+            indices.extend(row)
+            counts.extend(row.values())
+            indptr.append(len(indices))
+        indices = np.array(indices, dtype=np.intp)
+        values = 1 + np.log(np.array(counts, dtype=np.float32))
+        values *= np.log((1 + self.documents) / (1 + self.document_frequency[indices])) + 1
+        rows = np.repeat(np.arange(len(documents)), np.diff(indptr))
+        norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=len(documents)))
+        values /= np.where(norms == 0, 1, norms)[rows]
+        return rows, indices, values.astype(np.float32), len(documents)
+
+    def _scores(self, batch):
+        rows, indices, values, n = batch
+        scores = np.zeros((n, len(CATEGORIES)), dtype=np.float32)
+        np.add.at(scores, rows, self.weights[indices] * values[:, None])
+        return scores + self.bias
+
+    @staticmethod
+    def _softmax(scores):
+        scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def _train(self, documents, labels, epochs):
+        """Full-batch gradient descent on the cross-entropy, warm-started from the current weights."""
+        batch = self._vectorize(documents)
+        rows, indices, values, n = batch
+        targets = np.eye(len(CATEGORIES), dtype=np.float32)[labels]
+        for _ in range(epochs):
+            error = (self._softmax(self._scores(batch)) - targets) / n
+            gradient = self.l2 * self.weights
+            np.add.at(gradient, indices, values[:, None] * error[rows])
+            self.weights -= self.learning_rate * gradient
+            self.bias -= self.learning_rate * error.sum(axis=0)
+
+    def fit(self, articles):
+        """Trains from scratch on every labeled article; returns how many were used."""
+        self._reset()
+        return self.update(articles, epochs=self.epochs)
+
+    def update(self, articles, epochs=None):
+        """Learns from the labeled articles not seen before; returns how many there were."""
+        examples = [example for example in labeled_examples(articles) if example[0] not in self.trained_ids]
+        if not examples:
+            return 0
+        if epochs is None:
+            # A short warm start on the new articles, so they don't drown out what was learned before.
+            epochs = self.epochs if not self.trained else max(self.epochs // 5, 10)
+        ids, documents, labels = zip(*examples)
+        self._grow(documents)
+        self._train(documents, np.array(labels), epochs)
+        self.trained_ids.update(ids)
+        return len(examples)
+
+    def probabilities(self, headline, content):
+        return self._softmax(self._scores(self._vectorize([article_terms(headline, content)])))[0]
+
+    def predict(self, headline, content):
+        """(category, confidence); the category is None when untrained or less than `min_confidence` sure."""
+        if not self.trained:
+            return None, 0.0
+        probabilities = self.probabilities(headline, content)
+        best = int(probabilities.argmax())
+        confidence = float(probabilities[best])
+        return (CATEGORIES[best] if confidence >= self.min_confidence else None), confidence
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, weights=self.weights, bias=self.bias, document_frequency=self.document_frequency,
+                     documents=self.documents, vocabulary=np.array(list(self.vocabulary), dtype=str),
+                     trained_ids=np.array(sorted(self.trained_ids), dtype=str), categories=np.array(CATEGORIES))
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """Loads the saved model, if there is one (and it was trained on the same categories)."""
+        try:
+            with np.load(self.path) as data:
+                if list(data["categories"]) != CATEGORIES:
+                    print(f"⚠️ Classifier: {self.path} was trained on other categories, ignoring it.")
+                    return False
+                self.weights = data["weights"]
+                self.bias = data["bias"]
+                self.document_frequency = data["document_frequency"]
+                self.documents = int(data["documents"])
+                self.vocabulary = {str(term): i for i, term in enumerate(data["vocabulary"])}
+                self.trained_ids = {str(article_id) for article_id in data["trained_ids"]}
+        except FileNotFoundError:
+            return False
+        return True
+
+
+def evaluate(classifier, articles):
+    """Leave-one-out accuracy overall and on the articles it is confident about."""
+    examples = [article for article in articles if canonical_category(article.get("category")) and article.get("content")]
+    correct = confident = confident_correct = 0
+    for i, article in enumerate(examples):
+        model = CategoryClassifier(min_confidence=classifier.min_confidence, epochs=classifier.epochs)
+        model.fit(examples[:i] + examples[i + 1:])
+        probabilities = model.probabilities(article.get("headline"), article["content"])
+        predicted = CATEGORIES[int(probabilities.argmax())]
+        is_correct = predicted == canonical_category(article["category"])
+        correct += is_correct
+        if probabilities.max() >= classifier.min_confidence:
+            confident += 1
+            confident_correct += is_correct
+    total = max(len(examples), 1)
+    print(f"{len(examples)} labeled articles: {correct / total:.0%} leave-one-out accuracy; "
+          f"{confident / total:.0%} at ≥{classifier.min_confidence:.0%} confidence, "
+          f"{confident_correct / max(confident, 1):.0%} of those correct")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=["train", "update", "evaluate", "predict"])
+    parser.add_argument("text", nargs="*", help="predict: headline and article text")
+    parser.add_argument("--database", default=DATABASE_FILE)
+    args = parser.parse_args()
+
+    classifier = CategoryClassifier.from_env()
+    if args.command == "predict":
+        headline, content = (args.text + ["", ""])[:2]
+        category, confidence = classifier.predict(headline, content)
+        print(f"{category or 'not sure'} ({confidence:.0%})")
+        return
+    articles = load_database(args.database)
+    if args.command == "evaluate":
+        evaluate(classifier, articles)
+    elif args.command == "train":
+        print(f"🏷️ Trained on {classifier.fit(articles)} labeled articles from {args.database}")
+        classifier.save()
+    else:
+        print(f"🏷️ Learned from {classifier.update(articles)} new labeled articles")
+        classifier.save()
+
+
+if __name__ == "__main__":
+    main()
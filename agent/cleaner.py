@@ -0,0 +1,275 @@
+"""
+Rule-based cleanup of the Article-Writer's drafts: chatty preambles and sign-offs,
+repeated headlines, banners, dateline variants and stray markdown. `validate()`
+says what the rules couldn't fix; only then does the draft need the LLM editor.
+
+    python cleaner.py ../backend/database.json    # checks the examples, then how many stored articles would pass
+"""
+import json
+import re
+import sys
+
+from history import normalize_title
+
+# "Here is a rewritten version of the satirical article:", "Here's the revised article, ...:"
+PREAMBLE = re.compile(
+    r"^(here(?:'s| is| are)|below is|sure|certainly|okay|of course|i've (?:rewritten|revised))\b[^\n]{0,200}:$", re.I
+)
+# Notes to the editor after the article: "Changes made:", "(Note: I've incorporated...)", "I made the following changes".
+# Only phrasings no story paragraph opens with; they are only looked for among the closing blocks.
+POSTSCRIPT = re.compile(
+    r"^\(?(?:notes?\s*:|changes(?: made)?\s*:|word count\s*:|i hope (?:this|that|you)\b|let me know\b|feel free to\b"
+    r"|i(?: have|'ve)? made the following changes|in this (?:revised|rewritten|updated) (?:version|draft), i\b)", re.I
+)
+LIST_BLOCK = re.compile(r"(?:^[ \t]*(?:[-*•]|\d+[.)])\s+.*(?:\n|$))+", re.M)
+BANNER = re.compile(r"^(satire alert|satire|breaking(?: news)?|not a real news article.*|for immediate release)[.!:]?$", re.I)
+# The disclaimer is appended when the article is submitted; a writer-made one would repeat it.
+# Only blocks that open like one count: a closing joke may well mention "purely coincidental".
+DISCLAIMER = re.compile(
+    r"^\(?(?:disclaimer\b|this (?:article|story|piece) is,?(?: of course,)? (?:a work of |pure |entirely )?"
+    r"(?:satire|satirical|fiction|fictional)\b)", re.I
+)
+DATELINE_LABEL = re.compile(r"^\**\s*dateline\s*:?\s*\**\s*:?\s*(.+?)\s*\**$", re.I | re.S)
+# "**Washington D.C.** In a bizarre turn..." or "**Washington D.C.** - In..."
+BOLD_DATELINE = re.compile(r"^\*\*([^*\n]{2,60}?)\*\*\s*[-–—:]?\s+(?=\S)")
+# A first paragraph that already starts "BERLIN, GERMANY - " / "Washington D.C. — ".
+HAS_DATELINE = re.compile(r"^[A-Z][^\n.!?]{1,60}?\s[-–—]\s")
+HEADLINE_LABEL = re.compile(r"^(?:(?:satirical )?(?:news )?headline|title)\s*:\s*", re.I)
+# "1. ", "2) ", "- ", "Option 1: " in front of one of several headline options.
+LIST_MARKER = re.compile(r"^(?:[-*•]|\d+[.)]|option \d+\s*:)\s+", re.I)
+QUOTES = "\"'“”‘’"
+# Signs the text is talking to us rather than being the article.
+META = re.compile(
+    r"\b(?:as an ai|i'm happy to help|i am happy to help|i can(?:not|'t) (?:help|write|provide)|could you please"
+    r"|please provide|(?:rewritten|revised) version|here(?:'s| is) (?:the|a|an|your) (?:revised|rewritten|updated|satirical|article|draft)"
+    r"|word count)\b|\[[a-z ]*(?:insert|angle|name)[a-z ]*\]",
+    re.I,
+)
+MIN_ARTICLE_WORDS = 150
+MAX_HEADLINE_WORDS = 20
+
+
+def strip_markup(text):
+    """A block without its markdown emphasis and heading marks."""
+    text = re.sub(r"^#{1,6}\s*", "", text.strip())
+    return re.sub(r"(\*\*|__|(?<!\w)\*(?!\s)|(?<!\w)_(?!\s))", "", text).strip()
+
+
+def unquote(text):
+    text = text.strip()
+    while len(text) > 1 and text[0] in QUOTES and text[-1] in QUOTES:
+        text = text[1:-1].strip()
+    # A lone opening quote, like '" Durant Trade Expands...'
+    if text.count('"') == 1:
+        text = text.replace('"', "").strip()
+    return text
+
+
+def clean_headline(text):
+    """The bare headline: no preamble, label, markdown, wrapping quotes or trailing period."""
+    lines = [line.strip() for line in (text or "").splitlines() if line.strip()]
+    lines = [line for line in lines if not PREAMBLE.match(strip_markup(line))] or lines
+    headline = strip_markup(lines[0]) if lines else ""
+    headline = unquote(HEADLINE_LABEL.sub("", LIST_MARKER.sub("", headline)))
+    headline = re.sub(r"^(?:breaking|satire)\s*:\s*", "", headline, flags=re.I)
+    headline = re.sub(r"\s+", " ", headline).rstrip(".")
+    return unquote(headline)
+
+
+def is_heading(block):
+    """A block that is entirely a markdown heading or bold line (the frontend shows **...** blocks as headings)."""
+    return bool(re.fullmatch(r"#{1,6}\s+.+|\*\*[^\n]+\*\*", block.strip()))
+
+
+def same_headline(block, headline):
+    text = normalize_title(re.sub(r"^(?:breaking|satire)\s*:\s*", "", unquote(strip_markup(block)), flags=re.I))
+    target = normalize_title(headline)
+    if not text or not target:
+        return False
+    if text == target or text in target or target in text:
+        return True
+    words, target_words = set(text.split()), set(target.split())
+    return len(words & target_words) / len(words | target_words) >= 0.6
+
+
+def is_place(block):
+    """A short line that reads like a dateline: "London, UK", "CHICAGO, IL - MARCH 15, 2023"."""
+    text = strip_markup(block)
+    return (len(text.split()) <= 8 and "\n" not in text and not text.endswith((".", "!", "?", ":"))
+            and ("," in text or text.isupper() or text.endswith("D.C")))
+
+
+def normalize_paragraph(block):
+    """Turns a markdown heading into a **...** heading block and drops emphasis inside paragraphs."""
+    block = re.sub(r"[ \t]+\n", "\n", block.strip())
+    if re.fullmatch(r"#{1,6}\s+.+", block):
+        return f"**{strip_markup(block)}**"
+    if is_heading(block):
+        return block
+    return re.sub(r"\*\*([^*\n]+)\*\*|__([^_\n]+)__", lambda m: m.group(1) or m.group(2), block)
+
+
+def clean_article(text, headline=None):
+    """The publishable article text, starting with its dateline when it has one."""
+    text = (text or "").replace("\r\n", "\n").strip()
+    blocks = [block.strip() for block in re.split(r"\n\s*(?:-{3,}\s*)?\n|^-{3,}\n", text) if block.strip()]
+    blocks = [block for block in blocks if not re.fullmatch(r"[-*_]{3,}", block)]
+
+    # Leading chatter, banners and title lines; a dateline line among them is kept aside.
+    dateline = None
+    while blocks:
+        plain = strip_markup(blocks[0])
+        label = DATELINE_LABEL.match(blocks[0])
+        if PREAMBLE.match(plain) or BANNER.match(plain) or (headline and same_headline(blocks[0], headline)):
+            blocks.pop(0)
+        elif dateline is None and label and "\n" not in label.group(1) and len(blocks) > 1:
+            dateline = strip_markup(label.group(1))
+            blocks.pop(0)
+        elif dateline is None and is_place(blocks[0]) and len(blocks) > 1:
+            dateline = plain
+            blocks.pop(0)
+        elif is_heading(blocks[0]) and len(blocks) > 1 and len(plain.split()) <= MAX_HEADLINE_WORDS:
+            blocks.pop(0)  # a title the writer made up
+        else:
+            break
+
+    # Notes to the editor (with any list of changes under them), banners and disclaimers at the end.
+    end = len(blocks)
+    while end > 1:
+        plain = strip_markup(blocks[end - 1])
+        if POSTSCRIPT.match(plain) or BANNER.match(plain) or DISCLAIMER.match(plain):
+            del blocks[end - 1:]
+        elif not LIST_BLOCK.fullmatch(blocks[end - 1]):
+            break
+        end -= 1
+    blocks = [block for block in blocks if not BANNER.match(strip_markup(block))]
+    if not blocks:
+        return ""
+
+    # Datelines: "Dateline: X" with the story on the next line, or a bold place prefix.
+    label = DATELINE_LABEL.match(blocks[0])
+    if dateline:
+        blocks[0] = f"{dateline} - {blocks[0]}"
+    elif label and "\n" in label.group(1):
+        place, _, rest = label.group(1).partition("\n")
+        blocks[0] = f"{strip_markup(place)} - {rest.strip()}"
+    else:
+        blocks[0] = BOLD_DATELINE.sub(lambda m: f"{m.group(1).strip()} - ", blocks[0], count=1)
+
+    return "\n\n".join(normalize_paragraph(block) for block in blocks)
+
+
+def has_dateline(article):
+    return bool(HAS_DATELINE.match(article or ""))
+
+
+def validate(headline, article):
+    """What is still wrong with a cleaned draft; an empty list means it can be published as it is."""
+    problems = []
+    if not headline:
+        problems.append("no headline")
+    elif len(headline.split()) > MAX_HEADLINE_WORDS or META.search(headline) or "\n" in headline:
+        problems.append("headline is not a bare headline")
+    elif (LIST_MARKER.match(headline) or (headline[0] in QUOTES and headline[-1] in QUOTES)
+          or headline.count('"') % 2 or headline.count("“") != headline.count("”")):
+        problems.append("headline has a list marker or stray quotes")
+    words = len((article or "").split())
+    if words < MIN_ARTICLE_WORDS:
+        problems.append(f"article is only {words} words")
+    if article and META.search(article):
+        problems.append(f"meta-commentary (\"{META.search(article).group(0)}\")")
+    for block in (article or "").split("\n\n"):
+        if not is_heading(block) and ("**" in block or re.match(r"#{1,6}\s", block)):
+            problems.append("leftover markdown")
+            break
+    if article and not article.rstrip().endswith(tuple(".!?" + QUOTES + ")")):
+        problems.append("article looks cut off")
+    if article and article.count('"') % 2:
+        problems.append("unbalanced quotes")
+    return problems
+
+
+def clean_draft(headline, article):
+    """(headline, article, problems) for a writer's draft."""
+    headline = clean_headline(headline)
+    article = clean_article(article, headline)
+    return headline, article, validate(headline, article)
+
+
+# Drafts the rules have got wrong before: (draft, text the cleaned article must contain, text it must not).
+EXAMPLES = [
+    ("The ministry issued a statement on Tuesday.\n\nAny resemblance between the new policy and the old one is purely coincidental, "
+     "the minister insisted.", "purely coincidental, the minister insisted", None),
+    ("The ministry issued a statement on Tuesday.\n\nThe memoir, billed as a work of fiction, topped the non-fiction charts by Friday.",
+     "billed as a work of fiction", None),
+    ("The ministry issued a statement on Tuesday.\n\n---\n**Disclaimer:** This article is a work of satire. Any resemblance to "
+     "actual events is purely coincidental.", "The ministry issued a statement on Tuesday.", "Disclaimer"),
+    ("The ministry issued a statement on Tuesday.\n\nThis article is, of course, a work of satire. Or is it?",
+     "The ministry issued a statement on Tuesday.", "work of satire"),
+    ("The ministry issued a statement on Tuesday.\n\n**Changes made:**\n\n* Sharpened the ending",
+     "The ministry issued a statement on Tuesday.", "Changes made"),
+    ("The ministry issued a statement on Tuesday.\n\nI made the following changes to address the feedback:\n\n"
+     "* Sharpened the ending\n* Cut the second quote\n\nI hope this version works better!",
+     "The ministry issued a statement on Tuesday.", "Sharpened"),
+    # Story paragraphs that open like notes to the editor, and what follows them, stay.
+    ("The ministry issued a statement on Tuesday.\n\nThis updated version of the tax code, officials said, will take "
+     "effect next year.\n\n\"It is simpler than ever,\" said an expert, holding a 900-page summary.",
+     "said an expert, holding a 900-page summary", None),
+    ("The ministry issued a statement on Tuesday.\n\nI added, said the accountant, a column for regret. I kept the "
+     "receipts too.\n\nThe audit continues.", "I added, said the accountant", None),
+    ("The ministry issued a statement on Tuesday.\n\nThe new forms require:\n\n- a signature\n- a second signature",
+     "- a second signature", None),
+]
+
+# Headline-writer answers: (answer, the cleaned headline, whether validate() should still flag it).
+HEADLINE_EXAMPLES = [
+    ('Here are three satirical headline options:\n\n1. "Nation Reviews Its Reviews"\n2. "Review Finds Reviews Lacking"',
+     "Nation Reviews Its Reviews", False),
+    ('**Headline:** "Nation Reviews Its Reviews."', "Nation Reviews Its Reviews", False),
+    ("- Nation Reviews Its Reviews", "Nation Reviews Its Reviews", False),
+    ("Nation “Reviews Its Reviews", "Nation “Reviews Its Reviews", True),
+]
+
+
+def check_examples():
+    """Descriptions of the EXAMPLES and HEADLINE_EXAMPLES the rules get wrong; empty when they all come out right."""
+    failures = []
+    for draft, keep, drop in EXAMPLES:
+        cleaned = clean_article(draft, "Officials Deny Everything")
+        if keep not in cleaned or (drop and drop in cleaned):
+            failures.append(f"{draft[:60]!r}... cleaned to {cleaned[-80:]!r}")
+    for answer, expected, flagged in HEADLINE_EXAMPLES:
+        headline = clean_headline(answer)
+        problems = [problem for problem in validate(headline, "") if problem.startswith("headline")]
+        if headline != expected or bool(problems) != flagged:
+            failures.append(f"{answer[:60]!r} cleaned to {headline!r} ({'; '.join(problems) or 'not flagged'})")
+    return failures
+
+
+def main():
+    """Checks the EXAMPLES, then reports how the stored articles fare: how many pass, and what trips up the rest."""
+    failures = check_examples()
+    for failure in failures:
+        print(f"❌ {failure}")
+    total = len(EXAMPLES) + len(HEADLINE_EXAMPLES)
+    print(f"{total - len(failures)}/{total} examples cleaned as expected")
+    path = sys.argv[1] if len(sys.argv) > 1 else "../backend/database.json"
+    with open(path) as f:
+        articles = json.load(f).get("articles", [])
+    passed = 0
+    reasons = {}
+    for article in articles:
+        # Stored articles already carry the submission disclaimer; it is dropped like a writer-made one.
+        headline, content, problems = clean_draft(article["headline"], article["content"])
+        passed += not problems
+        for problem in problems:
+            reasons[problem.split(" (")[0]] = reasons.get(problem.split(" (")[0], 0) + 1
+    print(f"{passed}/{len(articles)} stored articles pass without the LLM editor")
+    for reason, count in sorted(reasons.items(), key=lambda item: -item[1]):
+        print(f"  {count:>3}  {reason}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import re
+
+import numpy as np
+
+from history import PUBLISHER_SUFFIX
+
+STOPWORDS = frozenset("""
+a about after against all also amid an and any are as at be been but by can could did do does for from had has
+have he her his how i if in into is it its just more most new no not of on or our out over said says she so some
+than that the their them then there these they this to up was we were what when which who will with would you your
+""".split())
+
+# Title terms count this many times over, since two stories' snippets differ far more than their headlines.
+TITLE_WEIGHT = 2
+
+
+def terms(text):
+    words = re.findall(r"[a-z0-9]+", PUBLISHER_SUFFIX.sub("", text or "").lower())
+    # Crude plural folding is enough for "tariff"/"tariffs".
+    return [word[:-1] if len(word) > 4 and word.endswith("s") else word
+            for word in words if word not in STOPWORDS and len(word) > 1]
+
+
+def tfidf_vectors(documents):
+    """
+    L2-normalized TF-IDF rows (float32) for a list of term lists, with a vocabulary
+    built from the documents themselves.
+    """
+    vocabulary = {}
+    rows, cols, counts = [], [], []
+    for row, document in enumerate(documents):
+        for term in document:
+            rows.append(row)
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(1.0)
+    matrix = np.zeros((len(documents), max(len(vocabulary), 1)), dtype=np.float32)
+    np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), counts)
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    matrix *= np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def trend_terms(trend):
+    return terms(trend["title"]) * TITLE_WEIGHT + terms(trend.get("content"))
+
+
+def cluster_trends(trends, threshold=0.35):
+    """
+    Groups trends that cover the same story (cosine similarity of title + snippet
+    above `threshold`, chained transitively). Returns lists of indexes into `trends`.
+    """
+    if not trends:
+        return []
+    vectors = tfidf_vectors([trend_terms(trend) for trend in trends])
+    similar = (vectors @ vectors.T) >= threshold
+
+    parent = list(range(len(trends)))
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    for i, j in zip(*np.nonzero(np.triu(similar, k=1))):
+        parent[root(int(j))] = root(int(i))
+
+    groups = {}
+    for i in range(len(trends)):
+        groups.setdefault(root(i), []).append(i)
+    return list(groups.values())
+
+
+def covered_by(trends, seen_headlines, threshold=0.5):
+    """For each trend, the closest already used or published headline at or above `threshold`, else None."""
+    seen_headlines = [headline for headline in seen_headlines if headline]
+    if not trends or not seen_headlines:
+        return [None] * len(trends)
+    # Headline against headline: the history only has titles.
+    vectors = tfidf_vectors([terms(trend["title"]) for trend in trends] + [terms(headline) for headline in seen_headlines])
+    similarity = vectors[:len(trends)] @ vectors[len(trends):].T
+    closest = similarity.argmax(axis=1)
+    return [seen_headlines[j] if similarity[i, j] >= threshold else None for i, j in enumerate(closest)]
+
+
+def drop_near_duplicates(trends, seen_headlines=(), threshold=0.35, seen_threshold=0.5):
+    """
+    Keeps one trend per story (the one with the longest snippet) and drops stories
+    that any of their versions shows were already used or published. Returns
+    (kept, dropped), where `dropped` holds (trend, reason) pairs.
+    """
+    covered = covered_by(trends, seen_headlines, seen_threshold)
+    kept, dropped = [], []
+    for group in cluster_trends(trends, threshold):
+        best = max(group, key=lambda i: len(trends[i].get("content") or ""))
+        previous = next((covered[i] for i in group if covered[i]), None)
+        if previous:
+            dropped.extend((trends[i], f"already covered as \"{previous}\"") for i in group)
+            continue
+        kept.append(trends[best])
+        dropped.extend((trends[i], f"same story as \"{trends[best]['title']}\"") for i in group if i != best)
+    return kept, dropped
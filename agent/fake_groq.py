@@ -0,0 +1,213 @@
+"""
+A local stand-in for Groq's OpenAI-compatible chat completions API. It gives canned
+but well-formed answers to every agent's prompt, so the whole pipeline can run
+offline, with adjustable latency, generation speed and injected 429s and 503s.
+Requests with "stream": true get server-sent events, one word per chunk.
+
+    python fake_groq.py --port 8765 --latency 0.3 --token-rate 500
+    GROQ_BASE_URL=http://127.0.0.1:8765/openai/v1 python agent.py
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ARTICLE = (
+    "NEW DELHI — In a move experts are calling \"entirely predictable in hindsight\", officials on Tuesday "
+    "announced a sweeping review of the review process itself. \"We have reviewed the situation and concluded "
+    "that further review is required,\" said Dr. Anita Rao, a senior fellow at the Institute for Deliberate "
+    "Delay. A recent survey found that 73 percent of committees exist primarily to form subcommittees. "
+    "\"The numbers speak for themselves, mostly in footnotes,\" added economist Rahul Mehta. Retired civil "
+    "servant K. Iyer agreed: \"In my day we postponed things properly.\" At press time, the review had been "
+    "scheduled for review.\n\n"
+    "The announcement follows last year's landmark decision to commission a feasibility study into whether "
+    "feasibility studies are feasible. That study, delivered eleven months late and four hundred pages long, "
+    "recommended a follow-up study with a broader mandate and a larger catering budget. \"Nobody can accuse "
+    "us of rushing,\" said a ministry spokesperson, who asked not to be named until a naming committee had "
+    "met. Opposition leaders criticised the plan as \"a review too far\" and promptly demanded a review of it. "
+    "Citizens hoping for a decision on anything at all were advised to check back in the next fiscal year, "
+    "or possibly the one after that."
+)
+
+
+def fake_reply(prompt, is_json):
+    """Picks an answer shaped like what the agent that sent `prompt` expects."""
+    if is_json and "Brainstorm 3" in prompt:
+        return json.dumps({
+            "angles": ["Officials form a committee to investigate why committees keep forming.",
+                       "The problem is solved by renaming it.",
+                       "Experts warn that experts are warning too much."],
+            "best": 1,
+            "headline": "Nation's Committees Announce Review Of Reviewing Reviews",
+        })
+    if is_json and '"humor"' in prompt:
+        return json.dumps({"humor": "Approved", "style": "Approved"})
+    if is_json:
+        return json.dumps({
+            "cleaned_headline": "Nation's Committees Announce Review Of Reviewing Reviews",
+            "cleaned_article": ARTICLE,
+            "category": "Politics",
+        })
+    batch = re.search(r"pick the (\d+) most promising", prompt)
+    if batch:
+        return ", ".join(str(i + 1) for i in range(int(batch.group(1))))
+    if "Respond with ONLY the category" in prompt:
+        return "Politics"
+    if "Respond with ONLY the number" in prompt or "A single digit" in prompt:
+        return "1"
+    if "Brainstorm 3" in prompt:
+        return ("1. Officials form a committee to investigate why committees keep forming.\n"
+                "2. The problem is solved by renaming it.\n"
+                "3. Experts warn that experts are warning too much.")
+    if "satirical news headline" in prompt:
+        return "Nation's Committees Announce Review Of Reviewing Reviews"
+    if "comedy critic" in prompt or "style evaluation" in prompt:
+        return "Approved"
+    if "summarize" in prompt:
+        return "Officials announced a review of an ongoing process. Critics say it will take years."
+    return ARTICLE
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        number = self.server.count("requests")
+        if payload.get("model") in self.server.down_models or random.random() < self.server.error_rate:
+            self.server.count("errors")
+            self._send_json(503, {"error": {"message": "Service unavailable"}})
+            return
+        if self.server.throttle_every and number % self.server.throttle_every == 0:
+            self.server.count("throttled")
+            self._send_json(429, {"error": {"message": "Rate limit reached"}},
+                            {"Retry-After": str(self.server.retry_after)})
+            return
+
+        time.sleep(max(0.0, random.gauss(self.server.latency, self.server.latency * 0.2)))
+        prompt = "\n".join(message.get("content", "") for message in payload.get("messages", []))
+        # Streamed requests can't use JSON mode, so go by the prompt as well.
+        is_json = (payload.get("response_format") or {}).get("type") == "json_object" or "JSON object" in prompt
+        content = fake_reply(prompt, is_json)
+        prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        if payload.get("stream"):
+            self._stream(payload, content, usage)
+            return
+        if self.server.token_rate:
+            time.sleep(completion_tokens / self.server.token_rate)
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    def _stream(self, payload, content, usage):
+        """Sends `content` as chat.completion.chunk events, paced at the server's token rate."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunk = {"id": f"chatcmpl-{uuid.uuid4().hex}", "object": "chat.completion.chunk",
+                 "created": int(time.time()), "model": payload.get("model")}
+
+        def send(choice, **extra):
+            data = f"data: {json.dumps(dict(chunk, choices=[dict(choice, index=0)], **extra))}\n\n".encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        try:
+            for word in re.findall(r"\S+\s*", content):
+                if self.server.token_rate:
+                    time.sleep(max(len(word) // 4, 1) / self.server.token_rate)
+                send({"delta": {"content": word}, "finish_reason": None})
+            send({"delta": {}, "finish_reason": "stop"}, x_groq={"usage": usage})
+            done = b"data: [DONE]\n\n"
+            self.wfile.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(done), done))
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # the client stopped reading early
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.3, throttle_every=0, retry_after=1, error_rate=0.0, down_models=(),
+                 token_rate=0):
+        super().__init__(("127.0.0.1", port), FakeGroqHandler)
+        self.latency = latency
+        self.token_rate = token_rate
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.down_models = set(down_models)
+        self.stats = {"connections": 0, "requests": 0, "throttled": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/openai/v1"
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+            return self.stats[name]
+
+
+def start_fake_server(**options):
+    """Starts a FakeGroqServer on a background thread (port 0 picks a free port)."""
+    server = FakeGroqServer(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="mean seconds per completion")
+    parser.add_argument("--token-rate", type=float, default=0, help="completion tokens per second (0: instant)")
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every Nth request with a 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 503")
+    parser.add_argument("--down-model", action="append", default=[], help="a model that always answers 503")
+    args = parser.parse_args()
+
+    server = FakeGroqServer(args.port, args.latency, args.throttle_every, args.retry_after,
+                            args.error_rate, args.down_model, args.token_rate)
+    print(f"🤖 Fake Groq API listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"Served {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import asyncio
+import atexit
+import json
+import os
+import threading
+
+import httpx
+
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
+
+
+class AsyncGroqClient:
+    """
+    Chat completions over one shared httpx.AsyncClient, so every call reuses a
+    keep-alive connection instead of paying TCP and TLS setup again.
+
+    Async callers await `chat()`; synchronous code (the agents, which run in plain
+    threads) goes through `run_sync()`, which hands the coroutine to a single
+    background event loop and waits for the answer.
+    """
+    def __init__(self, api_key, base_url=GROQ_BASE_URL, timeout=45.0, connect_timeout=10.0,
+                 max_connections=20, max_concurrency=8):
+        self.api_key = api_key
+        self.url = f"{base_url.rstrip('/')}/chat/completions"
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.max_concurrency = max_concurrency
+        self._clients = {}  # event loop -> (httpx.AsyncClient, concurrency semaphore)
+        self._loop = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, api_key):
+        """Reads GROQ_BASE_URL, GROQ_TIMEOUT, GROQ_CONNECT_TIMEOUT, GROQ_MAX_CONNECTIONS and GROQ_MAX_CONCURRENCY."""
+        return cls(
+            api_key,
+            base_url=GROQ_BASE_URL,
+            timeout=float(os.getenv("GROQ_TIMEOUT", 45)),
+            connect_timeout=float(os.getenv("GROQ_CONNECT_TIMEOUT", 10)),
+            max_connections=int(os.getenv("GROQ_MAX_CONNECTIONS", 20)),
+            max_concurrency=int(os.getenv("GROQ_MAX_CONCURRENCY", 8)),
+        )
+
+    def _pool(self):
+        # Connections and semaphores belong to one event loop, so each loop gets its own pool.
+        loop = asyncio.get_running_loop()
+        if loop not in self._clients:
+            self._clients[loop] = (httpx.AsyncClient(timeout=self.timeout, limits=self.limits),
+                                   asyncio.Semaphore(self.max_concurrency))
+        return self._clients[loop]
+
+    async def post(self, payload):
+        """Sends one chat completion request and returns the raw httpx.Response."""
+        client, semaphore = self._pool()
+        async with semaphore:
+            return await client.post(self.url, json=payload, headers={"Authorization": f"Bearer {self.api_key}"})
+
+    async def stream(self, payload):
+        """
+        Sends a streamed (SSE) chat completion request and yields its chunks as dicts.
+        The read timeout applies between chunks, so a long answer that keeps coming
+        never times out. Closing the generator early drops the rest of the answer.
+        """
+        client, semaphore = self._pool()
+        async with semaphore:
+            async with client.stream("POST", self.url, json=dict(payload, stream=True),
+                                     headers={"Authorization": f"Bearer {self.api_key}"}) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        return
+                    yield json.loads(data)
+
+    async def aclose(self):
+        """Closes the connection pool of the running event loop."""
+        entry = self._clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[0].aclose()
+
+    def _background_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="groq-client", daemon=True).start()
+                atexit.register(self.close)
+            return self._loop
+
+    def submit(self, coroutine):
+        """Schedules a coroutine on the client's event loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._background_loop())
+
+    def run_sync(self, coroutine):
+        """Runs a coroutine on the client's event loop and blocks the calling thread for its result."""
+        return self.submit(coroutine).result()
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self.aclose(), loop).result(timeout=5)
+            loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,160 @@
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# NewsAPI titles end in " - CNN", " - Bloomberg.com" and the like.
+PUBLISHER_SUFFIX = re.compile(r"\s+[-–—|]\s+[^-–—|]{1,40}$")
+
+
+def normalize_title(title):
+    """History key for a headline: publisher suffix, case, accents, punctuation and spacing don't matter."""
+    title = PUBLISHER_SUFFIX.sub("", title or "")
+    title = unicodedata.normalize("NFKD", title)
+    title = "".join(char for char in title if not unicodedata.combining(char)).casefold()
+    return " ".join(re.findall(r"\w+", title))
+
+
+class HistoryStore:
+    """
+    Headlines the newsroom has already used, as an append-only JSON Lines file with
+    a set of normalized keys in memory, so membership checks are O(1) and recording
+    a headline appends one line instead of rewriting the file.
+
+    Entries older than `ttl_days` are treated as unused again and dropped when the
+    file is compacted. Lines appended by other processes are picked up on the next
+    lookup, and a legacy `used_articles.json` list is imported the first time.
+    Appends and compactions hold an advisory lock on `<path>.lock`, so a compaction
+    can't drop a line another process is appending.
+    """
+    def __init__(self, path="used_articles.jsonl", ttl_days=30, legacy_path="used_articles.json"):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.legacy_path = legacy_path
+        self._used = {}  # normalized key -> (used_at, title)
+        self._offset = 0
+        self._inode = None  # the file version `_offset` refers to; compaction replaces it
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Reads HISTORY_FILE and HISTORY_TTL_DAYS."""
+        return cls(os.getenv("HISTORY_FILE", "used_articles.jsonl"), float(os.getenv("HISTORY_TTL_DAYS", 30)))
+
+    def _migrate_legacy(self):
+        if os.path.exists(self.path) or not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path) as f:
+                titles = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return
+        used_at = os.path.getmtime(self.legacy_path)
+        self._write_all([{"title": title, "used_at": used_at} for title in titles])
+        print(f"🗄️ History: imported {len(titles)} headlines from {self.legacy_path}")
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive hold on the lock file, shared by every process using the same history."""
+        with open(f"{self.path}.lock", "a+") as f:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue  # LK_LOCK gives up after ~10 seconds; keep waiting
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _write_all(self, records):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def _refresh(self):
+        """Reads lines added since the last look (by us or another process)."""
+        if not self._loaded:
+            self._migrate_legacy()
+            self._loaded = True
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            # Compaction writes a new file and renames it over the old one, so a new inode
+            # means our offset is meaningless, however large the new file has grown.
+            st = os.fstat(f.fileno())
+            if (st.st_dev, st.st_ino) != self._inode or st.st_size < self._offset:
+                self._used.clear()
+                self._offset = 0
+                self._inode = (st.st_dev, st.st_ino)
+            if st.st_size == self._offset:
+                return
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                self._offset += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._used[normalize_title(record["title"])] = (record["used_at"], record["title"])
+
+    def _fresh(self, used_at):
+        return time.time() - used_at < self.ttl
+
+    def __contains__(self, title):
+        with self._lock:
+            self._refresh()
+            entry = self._used.get(normalize_title(title))
+            return entry is not None and self._fresh(entry[0])
+
+    def titles(self):
+        """Every headline still inside the TTL window."""
+        with self._lock:
+            self._refresh()
+            return [title for used_at, title in self._used.values() if self._fresh(used_at)]
+
+    def add(self, title):
+        record = {"title": title, "used_at": time.time()}
+        with self._lock, self._file_lock():
+            self._refresh()
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+            self._refresh()
+            if len(self._used) > 100 and self._expired_share() > 0.5:
+                self._compact()
+
+    def _expired_share(self):
+        return sum(not self._fresh(used_at) for used_at, _ in self._used.values()) / len(self._used)
+
+    def _compact(self):
+        """Rewrites the file without expired entries (and duplicates); called with the file lock held."""
+        records = [{"title": title, "used_at": used_at} for used_at, title in self._used.values() if self._fresh(used_at)]
+        self._write_all(records)
+        self._refresh()
+
+    def __len__(self):
+        return len(self.titles())
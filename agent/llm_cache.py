@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(payload):
+    """Content address of a chat completion request: model, messages, temperature, max_tokens and response format."""
+    fields = {name: payload.get(name) for name in ("model", "messages", "temperature", "max_tokens", "response_format")}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+
+class LLMCache:
+    """
+    On-disk cache of LLM responses, one `<sha256>.json` file per request.
+
+    Entries expire after `ttl` seconds, and the least recently used ones are evicted
+    once there are more than `max_entries`. A hit bumps the file's mtime, so recency
+    survives restarts. Requests hotter than `max_temperature` skip the cache, for when
+    creative calls should give fresh answers every time.
+    """
+    def __init__(self, directory=".llm_cache", ttl=24 * 3600, max_entries=2000, max_temperature=None, enabled=True):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_temperature = max_temperature
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = None  # key -> mtime, least recently used first; loaded on first use
+
+    @classmethod
+    def from_env(cls):
+        """Reads LLM_CACHE (on/off), LLM_CACHE_DIR, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES and LLM_CACHE_MAX_TEMPERATURE."""
+        max_temperature = os.getenv("LLM_CACHE_MAX_TEMPERATURE")
+        return cls(
+            directory=os.getenv("LLM_CACHE_DIR", ".llm_cache"),
+            ttl=float(os.getenv("LLM_CACHE_TTL", 24 * 3600)),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 2000)),
+            max_temperature=float(max_temperature) if max_temperature else None,
+            enabled=os.getenv("LLM_CACHE", "on").lower() not in ("0", "off", "false", "no"),
+        )
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _index(self):
+        if self._entries is None:
+            os.makedirs(self.directory, exist_ok=True)
+            found = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".json"):
+                    found.append((entry.stat().st_mtime, entry.name[:-5]))
+            self._entries = OrderedDict((key, mtime) for mtime, key in sorted(found))
+        return self._entries
+
+    def _drop(self, key):
+        self._index().pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass  # another process evicted it first
+
+    def applies_to(self, payload):
+        if not self.enabled:
+            return False
+        if self.max_temperature is not None and payload.get("temperature", 0) > self.max_temperature:
+            with self._lock:
+                self.bypassed += 1
+            return False
+        return True
+
+    def get(self, key):
+        """Returns the cached response text for `key`, or None."""
+        with self._lock:
+            entries = self._index()
+            try:
+                with open(self._path(key)) as f:
+                    entry = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                entries.pop(key, None)
+                self.misses += 1
+                return None
+            if time.time() - entry["created_at"] > self.ttl:
+                self._drop(key)
+                self.misses += 1
+                return None
+            now = time.time()
+            os.utime(self._path(key), (now, now))
+            entries[key] = now
+            entries.move_to_end(key)
+            self.hits += 1
+            return entry["response"]
+
+    def put(self, key, response, model=None):
+        with self._lock:
+            entries = self._index()
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"model": model, "created_at": time.time(), "response": response}, f)
+            os.replace(tmp_path, path)
+            entries[key] = time.time()
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                self._drop(next(iter(entries)))
+                self.evictions += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "bypassed": self.bypassed, "evictions": self.evictions}
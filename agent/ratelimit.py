@@ -0,0 +1,159 @@
+import asyncio
+import os
+import threading
+import time
+
+# Requests per minute and tokens per minute (None = unlimited) for each scope.
+# Groq's limits are per model; "groq:*" applies to models not listed here.
+DEFAULT_LIMITS = {
+    "groq:*": (30, 6000),
+    "groq:llama-3.1-8b-instant": (30, 6000),
+    "groq:meta-llama/llama-4-maverick-17b-128e-instruct": (30, 6000),
+    "gnews": (60, None),
+    "newsapi": (60, None),
+}
+
+
+def parse_limits(spec):
+    """Parses "groq:llama-3.1-8b-instant=30/6000,gnews=60" into {scope: (rpm, tpm)}."""
+    limits = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        scope, _, value = item.partition("=")
+        rpm, _, tpm = value.partition("/")
+        limits[scope.strip()] = (float(rpm) if rpm.strip() else None, float(tpm) if tpm.strip() else None)
+    return limits
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units evenly over a minute and holds at most a minute's worth.
+
+    Callers reserve units up front; the balance may go negative, and the caller then
+    waits for the refill to cover it, so concurrent callers queue up fairly.
+    """
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount=1):
+        """Takes `amount` units and returns how many seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= amount
+            deficit_wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(deficit_wait, self._blocked_until - now)
+
+    def refund(self, amount):
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def pause(self, seconds):
+        """Blocks the bucket for `seconds`, e.g. after the server answered 429 with Retry-After."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """
+    Request and token buckets per scope ("groq:<model>", "gnews", ...), shared by
+    every agent in the process so calls only wait when a quota is actually close.
+    """
+    def __init__(self, limits=None):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    @classmethod
+    def from_env(cls):
+        """Defaults, overridden by AGENT_RATE_LIMITS (e.g. "groq:*=30/6000,newsapi=10")."""
+        limits = dict(DEFAULT_LIMITS)
+        limits.update(parse_limits(os.getenv("AGENT_RATE_LIMITS")))
+        return cls(limits)
+
+    def _limits_for(self, scope):
+        if scope in self.limits:
+            return self.limits[scope]
+        provider = scope.split(":", 1)[0]
+        return self.limits.get(f"{provider}:*", (None, None))
+
+    def _buckets_for(self, scope):
+        with self._lock:
+            if scope not in self._buckets:
+                rpm, tpm = self._limits_for(scope)
+                self._buckets[scope] = (TokenBucket(rpm) if rpm else None, TokenBucket(tpm) if tpm else None)
+            return self._buckets[scope]
+
+    def reserve(self, scope, tokens=0):
+        """Claims one request (and `tokens` tokens) from `scope` and returns how long to wait before sending it."""
+        requests_bucket, tokens_bucket = self._buckets_for(scope)
+        wait = 0.0
+        if requests_bucket:
+            wait = max(wait, requests_bucket.reserve(1))
+        if tokens_bucket and tokens:
+            wait = max(wait, tokens_bucket.reserve(tokens))
+        if wait > 0:
+            if wait >= 1:
+                print(f"⏳ Rate limiter: waiting {wait:.1f}s for {scope}")
+            with self._lock:
+                self.waited += wait
+        return wait
+
+    def acquire(self, scope, tokens=0):
+        """Blocks until one request (and `tokens` tokens) may be sent to `scope`."""
+        wait = self.reserve(scope, tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, scope, tokens=0):
+        """Like `acquire`, but waits without blocking the event loop."""
+        wait = self.reserve(scope, tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def settle(self, scope, reserved, used):
+        """Gives back tokens reserved for a call that turned out to use fewer."""
+        tokens_bucket = self._buckets_for(scope)[1]
+        if tokens_bucket and used is not None and reserved > used:
+            tokens_bucket.refund(reserved - used)
+
+    def backoff(self, scope, seconds):
+        """
+        Holds every caller of `scope` back for `seconds` (the server's Retry-After);
+        the next `acquire` waits it out.
+        """
+        buckets = self._buckets_for(scope)
+        if not any(buckets):
+            # No quota configured for this scope, but the server still asked us to wait.
+            with self._lock:
+                buckets = self._buckets[scope] = (TokenBucket(600), None)
+        for bucket in buckets:
+            if bucket:
+                bucket.pause(seconds)
+
+
+def estimate_tokens(prompt, max_tokens):
+    """Rough upper bound of what a chat completion counts against the token quota."""
+    return len(prompt) // 4 + max_tokens
+
+
+def retry_after(response, default=5.0):
+    """Seconds to wait from a 429 response's Retry-After header (numeric form)."""
+    try:
+        return max(float(response.headers.get("retry-after", default)), 0.0)
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,128 @@
+import os
+import random
+import threading
+import time
+
+import httpx
+
+# Worth retrying: the request may well succeed a moment later.
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+# The key itself is wrong; no amount of retrying or switching models will help.
+AUTH_STATUS = {401, 403}
+
+
+class GroqError(Exception):
+    """A failed Groq call, classified for the retry loop."""
+    def __init__(self, message, status=None, retryable=False, response=None):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.response = response
+
+    @property
+    def model_down(self):
+        """Server-side failures (5xx, timeouts, dropped connections) count against the model's circuit."""
+        return self.retryable and self.status != 429
+
+    @classmethod
+    def from_exception(cls, error):
+        if isinstance(error, GroqError):
+            return error
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            return cls(f"HTTP {status}: {error.response.text[:200]}", status,
+                       retryable=status in RETRYABLE_STATUS, response=error.response)
+        if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+            return cls(f"{type(error).__name__}: {error}", retryable=True)
+        # A 200 we can't read (missing choices, bad JSON) is not going to fix itself.
+        return cls(f"{type(error).__name__}: {error}")
+
+
+class CircuitOpenError(GroqError):
+    def __init__(self, model):
+        super().__init__(f"circuit open for {model}, failing fast")
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` server-side failures in a row, so calls to a model
+    that is down fail at once instead of each waiting out its retries. After
+    `reset_timeout` seconds one probe call is let through; its outcome closes or
+    re-opens the circuit.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True  # the probe
+            return False
+
+    def record(self, ok):
+        """Returns True if this outcome just opened the circuit."""
+        with self._lock:
+            if ok:
+                self.state = "closed"
+                self._failures = 0
+                return False
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                opened = self.state != "open"
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                return opened
+            return False
+
+
+class Resilience:
+    """Retry policy, per-model circuit breakers and the counters to watch them by."""
+    def __init__(self, max_attempts=4, base_delay=0.5, max_delay=20.0, failure_threshold=5, reset_timeout=30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self.counters = dict.fromkeys(
+            ["calls", "retries", "failures", "fatal", "short_circuited", "circuits_opened", "fallbacks"], 0
+        )
+
+    @classmethod
+    def from_env(cls):
+        """Reads GROQ_MAX_ATTEMPTS, GROQ_BACKOFF_BASE, GROQ_BACKOFF_MAX, GROQ_BREAKER_THRESHOLD and GROQ_BREAKER_RESET."""
+        return cls(
+            max_attempts=int(os.getenv("GROQ_MAX_ATTEMPTS", 4)),
+            base_delay=float(os.getenv("GROQ_BACKOFF_BASE", 0.5)),
+            max_delay=float(os.getenv("GROQ_BACKOFF_MAX", 20)),
+            failure_threshold=int(os.getenv("GROQ_BREAKER_THRESHOLD", 5)),
+            reset_timeout=float(os.getenv("GROQ_BREAKER_RESET", 30)),
+        )
+
+    def breaker(self, model):
+        with self._lock:
+            if model not in self._breakers:
+                self._breakers[model] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[model]
+
+    def delay(self, attempt):
+        """Full-jitter exponential backoff: anywhere up to base * 2^attempt, capped."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def stats(self):
+        with self._lock:
+            circuits = {model: breaker.state for model, breaker in self._breakers.items()}
+            return dict(self.counters, circuits=circuits)
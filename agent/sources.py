@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# Every news provider the Trend-Spotter knows, by name. Add one with @register_source.
+SOURCE_TYPES = {}
+
+FIXTURE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "trends.json")
+
+
+def register_source(cls):
+    SOURCE_TYPES[cls.name] = cls
+    return cls
+
+
+class NewsSource:
+    """
+    A trend provider plugin. `fetch(session)` returns a list of {"title", "content"}
+    dicts and may raise; the Trend-Spotter handles errors, timeouts and caching.
+    """
+    name = None
+    label = None
+    env_key = None  # the API key it needs, if any
+    timeout = 10
+
+    def __init__(self, api_key=None, timeout=None):
+        self.api_key = api_key
+        if timeout is not None:
+            self.timeout = timeout
+
+    @classmethod
+    def configured(cls, api_key=None, timeout=None):
+        """An instance if the source has what it needs to run, otherwise None."""
+        api_key = api_key or (os.getenv(cls.env_key) if cls.env_key else None)
+        if cls.env_key and not api_key:
+            return None
+        return cls(api_key, timeout)
+
+    def fetch(self, session):
+        raise NotImplementedError
+
+
+@register_source
+class GNewsSource(NewsSource):
+    name = "gnews"
+    label = "GNews (India)"
+    env_key = "GNEWS_API_KEY"
+
+    def fetch(self, session):
+        url = f"https://gnews.io/api/v4/top-headlines?country=in&lang=en&token={self.api_key}"
+        response = session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        valid_articles = []
+        for article in data.get("articles") or []:
+            title = article.get("title")
+            content = article.get("content")
+            if title and content and len(title.split()) > 3:
+                valid_articles.append({"title": title, "content": content})
+        return valid_articles[:10]
+
+
+@register_source
+class NewsAPISource(NewsSource):
+    name = "newsapi"
+    label = "NewsAPI (US)"
+    env_key = "NEWS_API_KEY"
+
+    def fetch(self, session):
+        url = f"https://newsapi.org/v2/top-headlines?country=us&apiKey={self.api_key}"
+        response = session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        valid_articles = []
+        if data.get("status") == "ok":
+            for article in data.get("articles") or []:
+                title = article.get("title")
+                content = article.get("content") or article.get("description")
+                if title and content and title != "[Removed]" and len(title.split()) > 3:
+                    valid_articles.append({"title": title, "content": content})
+        return valid_articles[:10]
+
+
+@register_source
+class FixtureSource(NewsSource):
+    """Canned trends from a local JSON file (TREND_FIXTURE, default fixtures/trends.json), for offline runs."""
+    name = "fixture"
+    label = "local fixtures"
+
+    def fetch(self, session):
+        with open(os.getenv("TREND_FIXTURE", FIXTURE_FILE)) as f:
+            return [{"title": article["title"], "content": article["content"]} for article in json.load(f)]
+
+
+def build_sources(names, api_keys=None, timeout=None):
+    """Instantiates the named sources that are configured, skipping (and reporting) the rest."""
+    sources = []
+    for name in names:
+        cls = SOURCE_TYPES.get(name)
+        if cls is None:
+            print(f"⚠️ Trend-Spotter: Unknown news source '{name}', skipping it.")
+            continue
+        source = cls.configured((api_keys or {}).get(name), timeout)
+        if source is not None:
+            sources.append(source)
+    return sources
+
+
+class TrendCache:
+    """
+    Each source's last successful fetch, kept on disk for `ttl` seconds so runs
+    within that window don't hit the news APIs (or their daily quotas) again.
+    """
+    def __init__(self, path=".trend_cache.json", ttl=900):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Reads TREND_CACHE_FILE and TREND_CACHE_TTL (seconds, 0 turns the cache off)."""
+        return cls(os.getenv("TREND_CACHE_FILE", ".trend_cache.json"), float(os.getenv("TREND_CACHE_TTL", 900)))
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def get(self, source_name):
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._load().get(source_name)
+        if entry and time.time() - entry["fetched_at"] < self.ttl:
+            return entry["articles"]
+        return None
+
+    def put(self, source_name, articles):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            data = self._load()
+            data[source_name] = {"fetched_at": time.time(), "articles": articles}
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+
+
+def fetch_trends(sources, session, limiter=None, cache=None):
+    """
+    Fetches every source at once over the shared `session`. Cached results are used
+    while fresh; a source that fails or runs past its timeout just contributes nothing.
+    """
+    results = {}
+    to_fetch = []
+    for source in sources:
+        cached = cache.get(source.name) if cache else None
+        if cached:
+            print(f"🗂️ Trend-Spotter Agent: Using cached trends from {source.label}.")
+            results[source.name] = cached
+        else:
+            to_fetch.append(source)
+
+    def fetch(source):
+        print(f"🕵️ Trend-Spotter Agent: Fetching trends and content from {source.label}...")
+        if limiter:
+            limiter.acquire(source.name)
+        return source.fetch(session)
+
+    if to_fetch:
+        pool = ThreadPoolExecutor(max_workers=len(to_fetch))
+        started = time.monotonic()
+        futures = [(pool.submit(fetch, source), source) for source in to_fetch]
+        pool.shutdown(wait=False)  # a source stuck past its timeout must not hold up the others
+        for future, source in sorted(futures, key=lambda item: item[1].timeout):
+            # The requests time out on their own; this also bounds a source stuck before or after its request.
+            remaining = started + source.timeout + 1 - time.monotonic()
+            try:
+                articles = future.result(timeout=max(remaining, 0))
+            except FutureTimeout:
+                print(f"{source.label} Error: no answer within {source.timeout}s")
+                continue
+            except Exception as e:
+                print(f"{source.label} Error: {e}")
+                continue
+            results[source.name] = articles
+            if articles and cache:
+                cache.put(source.name, articles)
+
+    # Keep the order the sources were configured in.
+    return [article for source in sources for article in results.get(source.name) or []]
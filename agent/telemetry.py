@@ -0,0 +1,289 @@
+import contextlib
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+import uuid
+
+# The span that LLM calls made right now are accounted to.
+CURRENT_SPAN = contextvars.ContextVar("current_span", default=None)
+
+# Dollars per million (prompt, completion) tokens, from Groq's price list.
+DEFAULT_PRICES = {
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "meta-llama/llama-4-maverick-17b-128e-instruct": (0.20, 0.60),
+}
+
+HISTOGRAM_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, math.inf)
+
+# What an LLM call adds up in its span, in the order the summary shows it.
+CALL_FIELDS = ("calls", "prompt_tokens", "completion_tokens", "wait", "retries", "cache_hits", "cost")
+
+
+def parse_prices(spec):
+    """Parses "model=prompt/completion,..." (dollars per million tokens) into a dict."""
+    prices = {}
+    for entry in (spec or "").split(","):
+        if "=" not in entry:
+            continue
+        model, value = entry.rsplit("=", 1)
+        prompt, _, completion = value.partition("/")
+        prices[model.strip()] = (float(prompt), float(completion or prompt))
+    return prices
+
+
+class Span:
+    """One timed piece of a run: a pipeline stage, or one agent's invocation with the LLM calls it made."""
+    def __init__(self, name, parent=None, **attributes):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.parent = parent
+        self.attributes = attributes
+        self.start = time.time()
+        self.end = None
+        self._lock = threading.Lock()
+
+    @property
+    def duration(self):
+        return (self.end or time.time()) - self.start
+
+    @property
+    def label(self):
+        index = self.attributes.get("index", self.attributes.get("round"))
+        return self.name if index is None else f"{self.name}[{index}]"
+
+    def set(self, **attributes):
+        with self._lock:
+            self.attributes.update(attributes)
+
+    def add(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self.attributes[name] = self.attributes.get(name, 0) + amount
+
+    def to_dict(self):
+        with self._lock:
+            return dict(span_id=self.id, parent_id=self.parent.id if self.parent else None, name=self.name,
+                        start=round(self.start, 4), duration=round(self.duration, 4), **self.attributes)
+
+
+class Metrics:
+    """Prometheus-style counters and histograms, rendered in the text exposition format."""
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, help_text, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help[name] = ("counter", help_text)
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, help_text, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help[name] = ("histogram", help_text)
+            counts, total = self._histograms.get(key, ([0] * len(HISTOGRAM_BUCKETS), 0.0))
+            for i, bound in enumerate(HISTOGRAM_BUCKETS):
+                if value <= bound:
+                    counts[i] += 1
+            self._histograms[key] = (counts, total + value)
+
+    def render(self):
+        def labels_text(labels, **extra):
+            pairs = list(labels) + list(extra.items())
+            return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}" if pairs else ""
+
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in sorted(self._help.items()):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                for (metric, labels), value in sorted(self._counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{labels_text(labels)} {value:g}")
+                for (metric, labels), (counts, total) in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, count in zip(HISTOGRAM_BUCKETS, counts):
+                        le = "+Inf" if bound == math.inf else f"{bound:g}"
+                        lines.append(f"{name}_bucket{labels_text(labels, le=le)} {count}")
+                    lines.append(f"{name}_sum{labels_text(labels)} {total:g}")
+                    lines.append(f"{name}_count{labels_text(labels)} {counts[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+class Telemetry:
+    """
+    Spans for every pipeline stage and agent invocation of a run, with the wall time,
+    rate-limit wait, tokens, retries, cache hits and cost of the LLM calls inside them.
+    Finished spans are appended to `<directory>/<run_id>.jsonl`; `finish()` writes the
+    matching metrics to `<run_id>.prom` and prints a per-stage summary with the run's
+    critical path.
+    """
+    def __init__(self, directory=".telemetry", prices=None, enabled=True):
+        self.directory = directory
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+        self.enabled = enabled
+        self.run_id = None
+        self.spans = []
+        self.metrics = Metrics()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Reads TELEMETRY (off disables it), TELEMETRY_DIR and GROQ_PRICES (e.g. "llama-3.1-8b-instant=0.05/0.08")."""
+        prices = dict(DEFAULT_PRICES)
+        prices.update(parse_prices(os.getenv("GROQ_PRICES")))
+        enabled = os.getenv("TELEMETRY", "on").lower() not in ("0", "off", "false", "no")
+        return cls(os.getenv("TELEMETRY_DIR", ".telemetry"), prices, enabled)
+
+    def start(self, run_id):
+        """Names the files this run's spans and metrics go to."""
+        self.run_id = run_id
+
+    def _path(self, extension):
+        if not (self.enabled and self.directory and self.run_id):
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{self.run_id}.{extension}")
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        """Times the block as a child of the current span; LLM calls inside it are accounted to it."""
+        span = Span(name, CURRENT_SPAN.get(), **attributes)
+        token = CURRENT_SPAN.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            CURRENT_SPAN.reset(token)
+            span.end = time.time()
+            if self.enabled:
+                self._finish_span(span)
+
+    def _finish_span(self, span):
+        record = span.to_dict()
+        with self._lock:
+            self.spans.append(span)
+            path = self._path("jsonl")
+            if path:
+                with open(path, "a") as f:
+                    f.write(json.dumps(dict(record, run_id=self.run_id)) + "\n")
+        labels = {"stage": span.name, "model": span.attributes.get("model", "")}
+        self.metrics.observe("newsroom_stage_duration_seconds", "Wall time of pipeline stages and agent invocations.",
+                             span.duration, **labels)
+        if not span.attributes.get("calls") and not span.attributes.get("cache_hits"):
+            return
+        for field, name, help_text in (
+            ("calls", "newsroom_llm_requests_total", "LLM requests sent."),
+            ("cache_hits", "newsroom_llm_cache_hits_total", "LLM answers served from the response cache."),
+            ("retries", "newsroom_llm_retries_total", "LLM requests retried after a transient failure."),
+            ("prompt_tokens", "newsroom_llm_prompt_tokens_total", "Prompt tokens used."),
+            ("completion_tokens", "newsroom_llm_completion_tokens_total", "Completion tokens used."),
+            ("wait", "newsroom_rate_limit_wait_seconds_total", "Time spent waiting on the rate limiter."),
+            ("cost", "newsroom_llm_cost_dollars_total", "Estimated spend."),
+        ):
+            if span.attributes.get(field):
+                self.metrics.inc(name, help_text, span.attributes[field], **labels)
+
+    def record_call(self, model, wait=0.0, usage=None, retries=0, cache_hit=False):
+        """Accounts one LLM call (or cache hit) to the current span."""
+        span = CURRENT_SPAN.get()
+        if span is None:
+            return
+        usage = usage or {}
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        completion_tokens = usage.get("completion_tokens") or 0
+        prompt_price, completion_price = self.prices.get(model, (0.0, 0.0))
+        span.set(model=model)
+        span.add(calls=0 if cache_hit else 1, cache_hits=int(cache_hit), wait=wait, retries=retries,
+                 prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                 cost=(prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6)
+
+    def bind(self, coroutine):
+        """
+        Wraps a coroutine headed for another thread's event loop so the LLM calls it
+        makes are still accounted to the caller's current span.
+        """
+        async def bound(span):
+            CURRENT_SPAN.set(span)  # tasks get their own context, so this stays inside the task
+            return await coroutine
+        return bound(CURRENT_SPAN.get())
+
+    @staticmethod
+    def carry(function):
+        """`function`, set up to run in a worker thread under the caller's current span."""
+        context = contextvars.copy_context()
+        return lambda *args, **kwargs: context.run(function, *args, **kwargs)
+
+    def critical_path(self):
+        """
+        The chain of leaf spans that determined the run's wall time: from the end of the
+        longest root span backwards, always the child that finished last.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        children = {}
+        for span in spans:
+            children.setdefault(span.parent.id if span.parent else None, []).append(span)
+
+        def path(span):
+            chain, cursor = [], span.end
+            candidates = sorted(children.get(span.id, []), key=lambda child: child.end, reverse=True)
+            for child in candidates:
+                if child.end <= cursor + 1e-3:
+                    chain.insert(0, child)
+                    cursor = child.start
+            return [leaf for child in chain for leaf in (path(child) if child.id in children else [child])] or [span]
+
+        roots = children.get(None, [])
+        return path(max(roots, key=lambda span: span.duration)) if roots else []
+
+    def summary(self):
+        """Per-stage totals of the run's spans, then its critical path."""
+        with self._lock:
+            spans = list(self.spans)
+        if not spans:
+            return "No spans recorded."
+        rows = {}
+        for span in spans:
+            row = rows.setdefault(span.name, dict(count=0, seconds=0.0, **dict.fromkeys(CALL_FIELDS, 0)))
+            row["count"] += 1
+            row["seconds"] += span.duration
+            for field in CALL_FIELDS:
+                row[field] += span.attributes.get(field, 0)
+
+        lines = [f"{'stage':<20} {'n':>3} {'total s':>8} {'mean s':>7} {'calls':>5} {'tok in':>7} {'tok out':>7} "
+                 f"{'wait s':>6} {'retry':>5} {'cache':>5} {'cost $':>8}"]
+        for name, row in sorted(rows.items(), key=lambda item: -item[1]["seconds"]):
+            lines.append(
+                f"{name:<20} {row['count']:>3} {row['seconds']:>8.2f} {row['seconds'] / row['count']:>7.2f} "
+                f"{row['calls']:>5} {row['prompt_tokens']:>7} {row['completion_tokens']:>7} {row['wait']:>6.1f} "
+                f"{row['retries']:>5} {row['cache_hits']:>5} {row['cost']:>8.4f}"
+            )
+        path = self.critical_path()
+        if path:
+            total = max(span.duration for span in spans if span.parent is None)
+            on_path = sum(span.duration for span in path)
+            lines.append(f"Critical path ({on_path:.1f}s of {total:.1f}s): "
+                         + " → ".join(f"{span.label} {span.duration:.1f}s" for span in path))
+        return "\n".join(lines)
+
+    def finish(self):
+        """Writes the run's metrics file and prints the summary."""
+        if not self.enabled:
+            return
+        path = self._path("prom")
+        if path:
+            with open(path, "w") as f:
+                f.write(self.metrics.render())
+        print("\n--- 📊 Telemetry ---")
+        print(self.summary())
+        if path:
+            print(f"Spans and metrics written to {self._path('jsonl')} and {path}")
@@ -0,0 +1,196 @@
+"""
+Drives the article API's list, detail, search and publish endpoints with concurrent
+clients against a synthetic archive, and reports req/s and latency percentiles.
+
+    python bench_api.py --sizes 10000 100000 --clients 8 --requests 2000
+    python bench_api.py --sizes 10000 --output before.json
+    python bench_api.py --sizes 10000 --baseline before.json   # flags regressions
+
+Each size gets a fresh database (from bench_store.make_articles) and its own
+uvicorn process, so runs are comparable.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from bench_store import CATEGORIES, make_articles
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+SCENARIOS = ["list", "list page 5", "category", "detail", "search", "publish"]
+
+
+def start_server(directory, port, storage):
+    """Runs the API over the database in `directory` and waits until it answers."""
+    env = dict(os.environ, ARTICLE_STORAGE=storage, ARTICLE_SQLITE_PATH=os.path.join(directory, "articles.db"))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR, "--port", str(port),
+         "--log-level", "warning"],
+        cwd=directory, env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+        try:
+            requests.get(f"{url}/api/articles", params={"limit": 1}, timeout=1)
+            return process, url
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start within 120s")
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def make_requests(scenario, articles, rng):
+    """A function that sends one `scenario` request over a session and returns the response."""
+    published = [article["id"] for article in articles if article["status"] == "published"]
+    drafts = [article["id"] for article in articles if article["status"] == "draft"]
+    rng.shuffle(drafts)
+    drafts_lock = threading.Lock()
+    words = [word for article in articles[:200] for word in article["headline"].lower().split()]
+
+    def list_page(session, base, pages):
+        cursor = None
+        for _ in range(pages):
+            params = {"limit": 20, "view": "summary"}
+            if cursor:
+                params["cursor"] = cursor
+            response = session.get(f"{base}/api/articles", params=params)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        return response
+
+    def publish(session, base):
+        with drafts_lock:
+            article_id = drafts.pop() if drafts else rng.choice(published)
+        return session.patch(f"{base}/api/articles/{article_id}/publish")
+
+    return {
+        "list": lambda session, base: list_page(session, base, 1),
+        "list page 5": lambda session, base: list_page(session, base, 5),
+        "category": lambda session, base: session.get(
+            f"{base}/api/articles", params={"limit": 20, "view": "summary", "category": rng.choice(CATEGORIES)}),
+        "detail": lambda session, base: session.get(f"{base}/api/articles/{rng.choice(published)}"),
+        "search": lambda session, base: session.get(
+            f"{base}/api/articles/search", params={"q": " ".join(rng.sample(words, 2)), "limit": 20}),
+        "publish": publish,
+    }[scenario]
+
+
+def run_scenario(url, send, clients, total):
+    """Sends `total` requests from `clients` threads, one keep-alive session each."""
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    remaining = iter(range(total))
+
+    def client():
+        nonlocal errors
+        session = requests.Session()
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            started = time.perf_counter()
+            try:
+                ok = send(session, url).status_code < 400
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                errors += not ok
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    return {
+        "req/s": len(latencies) / wall,
+        "p50 ms": percentile(latencies, 0.50) * 1000,
+        "p95 ms": percentile(latencies, 0.95) * 1000,
+        "p99 ms": percentile(latencies, 0.99) * 1000,
+        "mean ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "errors": errors,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Lines describing every scenario whose req/s or p95 got worse than `baseline` by more than `tolerance`."""
+    regressions = []
+    for key, row in results.items():
+        before = baseline.get(key)
+        if not before:
+            continue
+        if row["req/s"] < before["req/s"] * (1 - tolerance):
+            regressions.append(f"{key}: {before['req/s']:.0f} → {row['req/s']:.0f} req/s")
+        if row["p95 ms"] > before["p95 ms"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 {before['p95 ms']:.1f} → {row['p95 ms']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--storage", default="journal", choices=["journal", "snapshot", "sqlite"])
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--clients", type=int, default=8, help="concurrent client threads")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    columns = ["req/s", "p50 ms", "p95 ms", "p99 ms", "errors"]
+    print(f"{'scenario':<14}{'articles':>10}  " + "  ".join(f"{name:>9}" for name in columns))
+    results = {}
+    for size in args.sizes:
+        articles = make_articles(size)
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "database.json"), "w") as f:
+                json.dump({"articles": articles}, f)
+            process, url = start_server(directory, args.port, args.storage)
+            try:
+                for scenario in args.scenarios:
+                    send = make_requests(scenario, articles, random.Random(size))
+                    row = run_scenario(url, send, args.clients, args.requests)
+                    results[f"{scenario} @ {size}"] = row
+                    print(f"{scenario:<14}{size:>10}  " + "  ".join(
+                        f"{row[name]:>9.1f}" if name != "errors" else f"{row[name]:>9}" for name in columns))
+            finally:
+                process.terminate()
+                process.wait()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"⚠️ Regression: {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Measures lookup, list page, search, publish and delete costs of the article stores at
+several archive sizes, next to the linear scans the endpoints used to do.
+
+    python bench_store.py --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from store import ArticleStore, JournalBackend
+from sqlite_store import SqliteArticleStore
+
+CATEGORIES = ["Politics", "World News", "Business", "Technology", "Sports", "Entertainment", "Lifestyle", "Science"]
+WORDS = ("minister announces sweeping reform of national tea breaks amid growing concern "
+         "that experts say the spreadsheet caused unprecedented confusion across the country").split()
+
+
+def make_vocabulary(size=20000, seed=7):
+    """Made-up words with Zipf-like frequencies, so the search index sees a realistic term spread."""
+    rng = random.Random(seed)
+    letters = "etaoinshrdlucmfwypvbgkjqxz"
+    words = list(WORDS)
+    while len(words) < size:
+        words.append("".join(rng.choices(letters[:18], k=rng.randint(3, 9))))
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    return words, weights
+
+
+VOCABULARY, WEIGHTS = make_vocabulary()
+
+
+def make_articles(n, seed=42):
+    """Synthetic archive: ~400-word articles spread over the last few years, a third still drafts."""
+    rng = random.Random(seed)
+    start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    articles = []
+    for i in range(n):
+        articles.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "headline": " ".join(rng.choices(VOCABULARY, WEIGHTS, k=8)).title(),
+            "content": " ".join(rng.choices(VOCABULARY, WEIGHTS, k=400)),
+            "author": "AI Agent Team",
+            "category": rng.choice(CATEGORIES),
+            "created_at": (start + timedelta(minutes=i * 7)).isoformat(),
+            "status": "draft" if i % 3 == 0 else "published",
+        })
+    return articles
+
+
+def per_op(fn, items):
+    started = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - started) / max(len(items), 1) * 1e6
+
+
+def bench_linear(articles, ids):
+    """The old approach: scan the list for every request (JSON parsing not even counted)."""
+    def get(article_id):
+        for article in articles:
+            if article["id"] == article_id:
+                return article
+    return {"get": per_op(get, ids[:200])}
+
+
+def bench_store(store, articles, ids, drafts):
+    rng = random.Random(1)
+    # Two-word queries drawn from the middle of the vocabulary: common enough to match, rare enough to rank.
+    queries = [" ".join(rng.choices(VOCABULARY[50:2000], k=2)) for _ in range(200)]
+    results = {
+        "get": per_op(store.get, ids),
+        "list page": per_op(lambda _: store.list_by_status("published", limit=20, summary=True), range(500)),
+        "category page": per_op(
+            lambda _: store.list_by_status("published", category=rng.choice(CATEGORIES), limit=20, summary=True),
+            range(500),
+        ),
+        "search": per_op(lambda query: store.search(query, limit=20), queries),
+        "publish": per_op(lambda article_id: store.update(article_id, status="published"), drafts),
+        "delete": per_op(store.delete, ids[: len(drafts)]),
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--lookups", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'store':<10}{'articles':>10}  " + "  ".join(f"{name:>14}" for name in
+          ["get", "list page", "category page", "search", "publish", "delete"]) + "   (µs/op)")
+    for size in args.sizes:
+        articles = make_articles(size)
+        rng = random.Random(size)
+        ids = [rng.choice(articles)["id"] for _ in range(args.lookups)]
+        drafts = rng.sample([a["id"] for a in articles if a["status"] == "draft"], min(1000, size // 3))
+
+        linear = bench_linear(articles, ids)
+        print(f"{'list scan':<10}{size:>10}  {linear['get']:>14.1f}")
+
+        with tempfile.TemporaryDirectory() as directory:
+            # Never started, so nothing is flushed: this times the in-memory indexes alone.
+            memory = ArticleStore(JournalBackend(os.path.join(directory, "database.json")))
+            memory.load()
+            for article in articles:
+                memory.add(dict(article))
+            row = bench_store(memory, articles, ids, drafts)
+            print(f"{'memory':<10}{size:>10}  " + "  ".join(f"{value:>14.1f}" for value in row.values()))
+
+            sqlite = SqliteArticleStore(os.path.join(directory, "articles.db"))
+            sqlite.load()
+            sqlite.add_many(articles)
+            row = bench_store(sqlite, articles, ids, drafts)
+            print(f"{'sqlite':<10}{size:>10}  " + "  ".join(f"{value:>14.1f}" for value in row.values()))
+            sqlite.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+
+class ResponseCache:
+    """
+    A small LRU of pre-serialized response bodies.
+
+    Keys include the store version, so an entry can never be served after the
+    articles change; `clear()` additionally drops everything on local writes so
+    stale bodies don't hold on to memory until they age out.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def make_etag(version, key):
+    """Strong ETag for one representation (endpoint + parameters) at one store version."""
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def http_date(dt):
+    return format_datetime(dt.replace(microsecond=0), usegmt=True)
+
+
+def is_not_modified(headers, etag, last_modified):
+    """Evaluates If-None-Match (preferred) or If-Modified-Since against the current validators."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
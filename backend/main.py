@@ -1,11 +1,17 @@
+import base64
 import json
+import os
 import uuid
 from datetime import datetime, timezone
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional
 
+from store import SUMMARY_FIELDS, ArticleStore, make_backend, make_excerpt
+from sqlite_store import SqliteArticleStore
+from http_cache import ResponseCache, http_date, is_not_modified, make_etag
+
 app = FastAPI()
 
 # Allow frontend to connect
@@ -15,20 +21,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
 DB_FILE = "database.json"
+SQLITE_FILE = os.getenv("ARTICLE_SQLITE_PATH", "articles.db")
+# "journal" appends each change to a log next to DB_FILE and compacts it periodically;
+# "snapshot" rewrites DB_FILE on every flush;
+# "sqlite" keeps articles in SQLITE_FILE, importing DB_FILE the first time it starts.
+STORAGE_BACKEND = os.getenv("ARTICLE_STORAGE", "journal")
 
-def read_db():
-    try:
-        with open(DB_FILE, "r") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {"articles": []}
+if STORAGE_BACKEND == "sqlite":
+    store = SqliteArticleStore(SQLITE_FILE, migrate_from=DB_FILE)
+else:
+    # Articles live in memory for the lifetime of the process; the store flushes
+    # changes to the storage backend in the background.
+    store = ArticleStore(make_backend(STORAGE_BACKEND, DB_FILE))
 
-def write_db(data):
-    with open(DB_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+@app.on_event("startup")
+def open_store():
+    store.load()
+    store.start()
+
+@app.on_event("shutdown")
+def close_store():
+    store.close()
 
 class Article(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -39,80 +56,192 @@ class Article(BaseModel):
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     status: str = "draft"
 
+MAX_PAGE_SIZE = 100
+ARTICLE_FIELDS = set(Article.__fields__) | set(SUMMARY_FIELDS)
+
+# Serialized bodies of recent GET responses, keyed by (endpoint, parameters, store version).
+response_cache = ResponseCache()
+
+def cached_json(request, key, build):
+    """
+    Serves the data returned by `build()` as JSON with ETag and Last-Modified validators.
+
+    A conditional request that still matches gets a 304 before `build` runs. Otherwise the
+    serialized body is reused from the response cache until the store version changes.
+    `build` returns (data, extra_headers).
+    """
+    version, last_modified = store.version_info()
+    etag = make_etag(version, key)
+    headers = {"ETag": etag, "Last-Modified": http_date(last_modified), "Cache-Control": "no-cache"}
+    if is_not_modified(request.headers, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    entry = response_cache.get((key, version))
+    if entry is None:
+        data, extra_headers = build()
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        entry = (body, extra_headers)
+        response_cache.put((key, version), entry)
+    body, extra_headers = entry
+    return Response(content=body, media_type="application/json", headers={**headers, **extra_headers})
+
+def encode_cursor(article):
+    return base64.urlsafe_b64encode(f"{article['created_at']}|{article['id']}".encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        created_at, article_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, article_id
+
+def list_articles(request, status, category=None, limit=None, cursor=None, view=None, fields=None):
+    """
+    Shared by the list endpoints. Pages with `limit` + `cursor` (keyset on created_at, id):
+    when more results remain, the cursor for the next page is sent in the X-Next-Cursor
+    header. `view=summary` returns headline, category, author, created_at and a short
+    excerpt instead of the full content; `fields=` picks exactly which fields to return.
+    """
+    if view not in (None, "full", "summary"):
+        raise HTTPException(status_code=400, detail="view must be 'full' or 'summary'")
+    names = None
+    if fields:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = set(names) - ARTICLE_FIELDS
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    # Summaries are precomputed, so use them whenever they cover what was asked for.
+    summary = view == "summary" or (names is not None and set(names) <= set(SUMMARY_FIELDS))
+    before = decode_cursor(cursor) if cursor else None
+
+    def build():
+        articles = store.list_by_status(status, category=category, limit=limit, before=before, summary=summary)
+        headers = {}
+        if limit and len(articles) == limit:
+            headers["X-Next-Cursor"] = encode_cursor(articles[-1])
+        if names is not None:
+            if "excerpt" in names and not summary:
+                # Full records have no excerpt; derive it like the precomputed summaries do.
+                articles = [dict(article, excerpt=make_excerpt(article.get("content"))) for article in articles]
+            articles = [{name: article.get(name) for name in names} for article in articles]
+        return articles, headers
+
+    key = ("list", status, category.lower() if category else None, limit, before, summary, tuple(names or ()))
+    return cached_json(request, key, build)
+
 @app.get("/api/articles")
-def get_published_articles(category: Optional[str] = None): # Add optional category parameter
-    """Get all published articles, optionally filtered by category."""
-    db = read_db()
-    published_articles = [
-        article for article in db["articles"] if article["status"] == "published"
-    ]
-    
-    if category: # If a category is provided, filter the results
-        published_articles = [
-            article for article in published_articles if article.get("category", "").lower() == category.lower()
-        ]
-
-    return sorted(published_articles, key=lambda x: x["created_at"], reverse=True)
+def get_published_articles(
+    request: Request,
+    category: Optional[str] = None, # Add optional category parameter
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """Get published articles, newest first, optionally filtered by category and paginated."""
+    # If a category is provided, the store filters on it (case-insensitively)
+    return list_articles(request, "published", category, limit, cursor, view, fields)
 
 @app.get("/api/articles/drafts")
-def get_draft_articles():
-    db = read_db()
-    draft_articles = [
-        article for article in db["articles"] if article["status"] == "draft"
-    ]
-    return sorted(draft_articles, key=lambda x: x["created_at"], reverse=True)
+def get_draft_articles(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    return list_articles(request, "draft", None, limit, cursor, view, fields)
+
+# Declared before /api/articles/{article_id} so "search" isn't taken for an ID.
+@app.get("/api/articles/search")
+def search_articles(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+):
+    """Full-text search over published headlines and content, best match first."""
+    def build():
+        return store.search(q, status="published", limit=limit), {}
+
+    return cached_json(request, ("search", q.lower(), limit), build)
 
 @app.post("/api/articles", status_code=201)
 def create_article(article: Article):
     """Endpoint for the agent to submit a new draft article."""
-    db = read_db()
     # Corrected line using .dict() for older Pydantic versions
-    db["articles"].append(article.dict())
-    write_db(db)
+    store.add(article.dict())
+    response_cache.clear()
     return article
 
 @app.patch("/api/articles/{article_id}/publish")
 def publish_article(article_id: str):
-    db = read_db()
-    article_found = False
-    for article in db["articles"]:
-        if article["id"] == article_id:
-            article["status"] = "published"
-            article_found = True
-            break
-    
-    if not article_found:
+    if not store.update(article_id, status="published"):
         raise HTTPException(status_code=404, detail="Article not found")
-        
-    write_db(db)
+    response_cache.clear()
+
     return {"message": "Article published successfully"}
 
+# --- Batch endpoints ---
+# Each applies all of its items in one store batch (one transaction in SQLite, one
+# journal write in memory) and reports what happened to every item.
+
+MAX_BATCH_SIZE = 500
+
+class ArticleIds(BaseModel):
+    ids: list[str]
+
+def check_batch_size(items):
+    if not items:
+        raise HTTPException(status_code=422, detail="Batch is empty")
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=422, detail=f"Batches are limited to {MAX_BATCH_SIZE} items")
+
+def batch_results(found, done_status):
+    return {"results": [
+        {"id": article_id, "status": done_status if ok else "not_found"} for article_id, ok in found.items()
+    ]}
+
+@app.post("/api/articles:batch", status_code=201)
+def create_articles(articles: list[Article]):
+    """Submit several draft articles at once."""
+    check_batch_size(articles)
+    store.add_many([article.dict() for article in articles])
+    response_cache.clear()
+    return {"results": [{"id": article.id, "status": "created"} for article in articles]}
+
+@app.patch("/api/articles:publish")
+def publish_articles(body: ArticleIds):
+    """Publish several articles at once. Unknown IDs are reported as not_found."""
+    check_batch_size(body.ids)
+    found = store.update_many(body.ids, status="published")
+    response_cache.clear()
+    return batch_results(found, "published")
+
+@app.delete("/api/articles:batch")
+def delete_articles(body: ArticleIds):
+    """Delete several articles at once. Unknown IDs are reported as not_found."""
+    check_batch_size(body.ids)
+    found = store.delete_many(body.ids)
+    response_cache.clear()
+    return batch_results(found, "deleted")
+
 # ADD THIS NEW ENDPOINT
 @app.get("/api/articles/{article_id}")
-def get_article_by_id(article_id: str):
+def get_article_by_id(article_id: str, request: Request):
     """Get a single article by its unique ID."""
-    db = read_db()
-    for article in db["articles"]:
-        if article["id"] == article_id:
-            return article
-    raise HTTPException(status_code=404, detail="Article not found")
+    def build():
+        article = store.get(article_id)
+        if article is None:
+            raise HTTPException(status_code=404, detail="Article not found")
+        return article, {}
+
+    return cached_json(request, ("article", article_id), build)
 
 @app.delete("/api/articles/{article_id}", status_code=200)
 def delete_article(article_id: str):
     """Deletes an article by its unique ID."""
-    db = read_db()
-    
-    # Find the article to remove
-    article_to_remove = None
-    for article in db["articles"]:
-        if article["id"] == article_id:
-            article_to_remove = article
-            break
-            
-    if not article_to_remove:
+    if not store.delete(article_id):
         raise HTTPException(status_code=404, detail="Article not found")
-        
-    db["articles"].remove(article_to_remove)
-    write_db(db)
-    
+    response_cache.clear()
+
     return {"message": "Article deleted successfully"}
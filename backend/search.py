@@ -0,0 +1,91 @@
+import heapq
+import math
+import re
+from collections import Counter
+
+# Common words that match nearly every article and only dilute the ranking.
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can could did do does for from had has have he her
+his how i if in into is it its just more most new no not of on or our out over said says she so some than that
+the their them then there these they this to up was we were what when which who will with would you your
+""".split())
+
+# Headline terms count this many times over, so a match there outranks one in the body.
+HEADLINE_WEIGHT = 3
+
+
+def tokenize(text):
+    return [token for token in re.findall(r"[a-z0-9]+", (text or "").lower())
+            if len(token) > 1 and token not in STOPWORDS]
+
+
+class SearchIndex:
+    """
+    Inverted index over article headlines and content, ranked with BM25.
+
+    Documents are added and removed one at a time as articles change, so the index
+    never has to be rebuilt by rescanning the archive.
+    """
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}   # term -> {doc_id: term frequency}
+        self._doc_terms = {}  # doc_id -> its distinct terms, needed to remove it again
+        self._lengths = {}    # doc_id -> number of (weighted) terms
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def clear(self):
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._lengths.clear()
+        self._total_length = 0
+
+    def add(self, doc_id, headline, content):
+        """Indexes a document, replacing any earlier version of it."""
+        self.remove(doc_id)
+        terms = Counter(tokenize(content))
+        for term in tokenize(headline):
+            terms[term] += HEADLINE_WEIGHT
+        self._doc_terms[doc_id] = tuple(terms)
+        self._lengths[doc_id] = sum(terms.values())
+        self._total_length += self._lengths[doc_id]
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(doc_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def search(self, query, limit=20, accept=None):
+        """
+        Returns up to `limit` (score, doc_id) pairs, best first. `accept(doc_id)` can
+        filter candidates, e.g. to published articles only.
+        """
+        n = len(self._doc_terms)
+        if not n:
+            return []
+        avg_length = self._total_length / n
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        candidates = scores.items()
+        if accept is not None:
+            candidates = ((doc_id, score) for doc_id, score in candidates if accept(doc_id))
+        return [(score, doc_id) for doc_id, score in heapq.nlargest(limit, candidates, key=lambda item: item[1])]
@@ -0,0 +1,298 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from search import HEADLINE_WEIGHT, tokenize
+from store import SUMMARY_FIELDS, JournalBackend, make_excerpt
+
+COLUMNS = ("id", "headline", "content", "author", "category", "created_at", "status")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    headline TEXT NOT NULL,
+    content TEXT NOT NULL,
+    author TEXT NOT NULL,
+    category TEXT,
+    category_lower TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    excerpt TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_articles_status_created
+    ON articles (status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_articles_status_category_created
+    ON articles (status, category_lower, created_at, id);
+-- Single row bumped by every write, shared by all workers using this file.
+CREATE TABLE IF NOT EXISTS store_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    last_modified TEXT NOT NULL
+);
+"""
+
+# Full-text index over headline + content, kept in step with `articles` by triggers.
+# It shares the articles' rowids, so no text is stored twice.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    headline, content, content='articles', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, headline, content) VALUES (new.rowid, new.headline, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, headline, content) VALUES ('delete', old.rowid, old.headline, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF headline, content ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, headline, content) VALUES ('delete', old.rowid, old.headline, old.content);
+    INSERT INTO articles_fts (rowid, headline, content) VALUES (new.rowid, new.headline, new.content);
+END;
+"""
+
+
+class SqliteArticleStore:
+    """
+    Article store backed by SQLite, with the same interface as ArticleStore.
+
+    The list, drafts and category queries are range scans over the
+    (status, created_at) and (status, category_lower, created_at) indexes.
+    The database runs in WAL mode so readers never block the writer, and each
+    thread keeps one open connection that is reused for every request it serves.
+    """
+    def __init__(self, path, migrate_from=None):
+        self.path = path
+        self.migrate_from = migrate_from
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self.full_text = True  # False when this SQLite build lacks FTS5
+
+    # --- Connections ---
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    # --- Lifecycle ---
+
+    def load(self):
+        """Creates the schema and, on first use, imports the existing JSON database."""
+        conn = self._conn()
+        with conn:
+            conn.executescript(SCHEMA)
+            self._add_excerpt_column(conn)
+            self._create_full_text_index(conn)
+            conn.execute(
+                "INSERT OR IGNORE INTO store_meta (id, version, last_modified) VALUES (1, ?, ?)",
+                # Start from the clock, like ArticleStore, so a recreated file never reuses old versions.
+                (time.time_ns() // 1000, datetime.now(timezone.utc).isoformat()),
+            )
+        if self.migrate_from and len(self) == 0 and os.path.exists(self.migrate_from):
+            count = migrate_from_json(self.migrate_from, self)
+            print(f"Migrated {count} articles from {self.migrate_from} into {self.path}")
+
+    @staticmethod
+    def _add_excerpt_column(conn):
+        """Upgrades databases created before list summaries existed."""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(articles)")}
+        if "excerpt" in columns:
+            return
+        conn.execute("ALTER TABLE articles ADD COLUMN excerpt TEXT NOT NULL DEFAULT ''")
+        rows = conn.execute("SELECT id, content FROM articles").fetchall()
+        conn.executemany(
+            "UPDATE articles SET excerpt = ? WHERE id = ?",
+            [(make_excerpt(row["content"]), row["id"]) for row in rows],
+        )
+
+    def _create_full_text_index(self, conn):
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'").fetchone()
+        try:
+            conn.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ SQLite full-text search unavailable ({e}); search falls back to substring matching.")
+            self.full_text = False
+            return
+        if not exists:
+            # Index the articles that were already there.
+            conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+
+    def start(self):
+        pass  # Writes go straight to SQLite, so there is no flusher to run.
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    # --- Reads ---
+
+    def get(self, article_id):
+        row = self._conn().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM articles WHERE id = ?", (article_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def list_by_status(self, status, category=None, limit=None, before=None, summary=False):
+        """
+        Returns articles with the given status, newest first, optionally limited to one category.
+
+        `before` is a (created_at, id) key: only articles that sort strictly before it are
+        returned. With `summary` the lightweight summary records are returned instead.
+        """
+        columns = SUMMARY_FIELDS if summary else COLUMNS
+        query = f"SELECT {', '.join(columns)} FROM articles WHERE status = ?"
+        params = [status]
+        if category:
+            query += " AND category_lower = ?"
+            params.append(category.lower())
+        if before:
+            query += " AND (created_at, id) < (?, ?)"
+            params.extend(before)
+        query += " ORDER BY created_at DESC, id DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self._conn().execute(query, params)]
+
+    def search(self, query, status="published", limit=20):
+        """Full-text search over headlines and content. Returns summary records with a BM25 `score`, best first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        columns = ", ".join(f"a.{name}" for name in SUMMARY_FIELDS)
+        if self.full_text:
+            # Quote every term so user input can't inject FTS5 query syntax.
+            match = " OR ".join(f'"{term}"' for term in terms)
+            rows = self._conn().execute(
+                f"SELECT {columns}, -bm25(articles_fts, ?, 1.0) AS score "
+                "FROM articles_fts JOIN articles a ON a.rowid = articles_fts.rowid "
+                "WHERE articles_fts MATCH ? AND a.status = ? ORDER BY score DESC LIMIT ?",
+                (float(HEADLINE_WEIGHT), match, status, limit),
+            )
+        else:
+            conditions = " OR ".join("a.headline LIKE ? OR a.content LIKE ?" for _ in terms)
+            rows = self._conn().execute(
+                f"SELECT {columns}, 0.0 AS score FROM articles a WHERE a.status = ? AND ({conditions}) "
+                "ORDER BY a.created_at DESC LIMIT ?",
+                (status, *[f"%{term}%" for term in terms for _ in range(2)], limit),
+            )
+        return [{**dict(row), "score": round(row["score"], 4)} for row in rows]
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def version_info(self):
+        """Returns (version, last_modified) for the current contents."""
+        row = self._conn().execute("SELECT version, last_modified FROM store_meta WHERE id = 1").fetchone()
+        return row["version"], datetime.fromisoformat(row["last_modified"])
+
+    # --- Writes ---
+
+    def add(self, article):
+        self.add_many([article])
+        return article
+
+    def add_many(self, articles):
+        """Adds several articles in one transaction."""
+        conn = self._conn()
+        with conn:
+            for article in articles:
+                self._insert(conn, article)
+            self._bump_version(conn)
+
+    def update(self, article_id, **fields):
+        """Updates fields on an article. Returns False if the ID is unknown."""
+        return self.update_many([article_id], **fields)[article_id]
+
+    def delete(self, article_id):
+        """Removes an article. Returns False if the ID is unknown."""
+        return self.delete_many([article_id])[article_id]
+
+    def update_many(self, article_ids, **fields):
+        """Applies the same field changes to several articles in one transaction. Returns {id: found}."""
+        unknown = set(fields) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown article fields: {', '.join(sorted(unknown))}")
+        if "category" in fields:
+            fields["category_lower"] = (fields["category"] or "").lower()
+        if "content" in fields:
+            fields["excerpt"] = make_excerpt(fields["content"])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        return self._for_existing(
+            article_ids, f"UPDATE articles SET {assignments} WHERE id = ?", list(fields.values())
+        )
+
+    def delete_many(self, article_ids):
+        """Removes several articles in one transaction. Returns {id: found}."""
+        return self._for_existing(article_ids, "DELETE FROM articles WHERE id = ?", [])
+
+    def _for_existing(self, article_ids, statement, params):
+        """Runs `statement` for every ID that exists, inside a single write transaction."""
+        article_ids = list(dict.fromkeys(article_ids))
+        if not article_ids:
+            return {}
+        conn = self._conn()
+        with conn:
+            # Take the write lock up front so the existence check and the writes see the same data.
+            conn.execute("BEGIN IMMEDIATE")
+            placeholders = ", ".join("?" * len(article_ids))
+            existing = {row["id"] for row in conn.execute(
+                f"SELECT id FROM articles WHERE id IN ({placeholders})", article_ids
+            )}
+            conn.executemany(statement, [(*params, article_id) for article_id in article_ids if article_id in existing])
+            if existing:
+                self._bump_version(conn)
+        return {article_id: article_id in existing for article_id in article_ids}
+
+    @staticmethod
+    def _bump_version(conn):
+        conn.execute(
+            "UPDATE store_meta SET version = version + 1, last_modified = ? WHERE id = 1",
+            (datetime.now(timezone.utc).isoformat(),),
+        )
+
+    @staticmethod
+    def _insert(conn, article):
+        # An upsert rather than INSERT OR REPLACE, so the full-text triggers see an UPDATE.
+        conn.execute(
+            "INSERT INTO articles (id, headline, content, author, category, category_lower, created_at, status, excerpt) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET headline = excluded.headline, content = excluded.content, "
+            "author = excluded.author, category = excluded.category, category_lower = excluded.category_lower, "
+            "created_at = excluded.created_at, status = excluded.status, excerpt = excluded.excerpt",
+            (
+                article["id"], article["headline"], article["content"], article["author"],
+                article.get("category"), (article.get("category") or "").lower(), article["created_at"], article["status"],
+                make_excerpt(article["content"]),
+            ),
+        )
+
+
+def migrate_from_json(json_path, sqlite_store):
+    """Copies every article from the JSON database (snapshot plus any journal) into SQLite."""
+    articles = JournalBackend(json_path).load()
+    sqlite_store.add_many(articles)
+    return len(articles)
+
+
+# --- One-shot migration: python sqlite_store.py [database.json] [articles.db] ---
+if __name__ == "__main__":
+    json_path = sys.argv[1] if len(sys.argv) > 1 else "database.json"
+    sqlite_path = sys.argv[2] if len(sys.argv) > 2 else "articles.db"
+    target = SqliteArticleStore(sqlite_path)
+    target.load()
+    print(f"Migrated {migrate_from_json(json_path, target)} articles from {json_path} into {sqlite_path}")
+    target.close()
@@ -0,0 +1,593 @@
+import bisect
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from search import SearchIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Fields returned by the list endpoints' summary view.
+SUMMARY_FIELDS = ("id", "headline", "category", "author", "created_at", "status", "excerpt")
+EXCERPT_LENGTH = 250
+
+
+def make_excerpt(content, length=EXCERPT_LENGTH):
+    """Plain-text teaser for list views: markdown markers dropped, cut at a word boundary."""
+    text = re.sub(r"[*_#>`]+", "", content or "")
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0]
+
+
+def summarize(article):
+    summary = {name: article.get(name) for name in SUMMARY_FIELDS if name != "excerpt"}
+    summary["excerpt"] = make_excerpt(article.get("content"))
+    return summary
+
+
+class FileLock:
+    """
+    Advisory lock on a side file, shared by every process using the same database.
+
+    Shared holds let several readers catch up at once; an exclusive hold is taken for
+    writing. Windows has no shared mode, so there every hold is exclusive.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    @contextmanager
+    def hold(self, shared=False):
+        with open(self.path, "a+") as f:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue  # LK_LOCK gives up after ~10 seconds; keep waiting
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# --- Storage backends ---
+# A backend persists the operations the store applies in memory. Operations are
+# plain dicts so they can be written straight to a log:
+#   {"op": "put", "article": {...}}
+#   {"op": "update", "id": "...", "fields": {...}}
+#   {"op": "delete", "id": "..."}
+# Replaying an operation twice gives the same result, so a backend may safely
+# write one that is already reflected in a snapshot.
+#
+# Several processes (e.g. uvicorn workers) may share one backend's files. Every
+# method except `changed` must be called while holding `backend.lock`; `changes`
+# then reports what other processes wrote since this one last looked. `position`
+# names the persisted state this process has applied: processes at the same
+# position hold the same contents.
+
+def _write_atomic(path, payload):
+    """Writes to a temp file and renames it over `path`, so a crash never leaves a half-written file."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_snapshot(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f).get("articles", [])
+    except FileNotFoundError:
+        return []
+    except json.JSONDecodeError as e:
+        # Refuse to start rather than overwrite a damaged file with an empty one.
+        raise RuntimeError(f"{path} is not valid JSON: {e}") from e
+
+
+def _file_id(path):
+    """Identifies one version of a file that is only ever replaced by rename."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _position_token(file_id, offset=0):
+    """A short, ETag-safe name for a file version plus a journal offset."""
+    return ".".join(f"{part:x}" for part in (*(file_id or (0,)), offset))
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def apply_op(articles, op):
+    """Applies one operation to an id -> article dict."""
+    kind = op["op"]
+    if kind == "put":
+        articles[op["article"]["id"]] = op["article"]
+    elif kind == "update":
+        if op["id"] in articles:
+            articles[op["id"]].update(op["fields"])
+    elif kind == "delete":
+        articles.pop(op["id"], None)
+    else:
+        raise ValueError(f"Unknown store operation: {kind}")
+
+
+class SnapshotBackend:
+    """Rewrites the whole database file on every flush. Simple, but O(archive size) per write."""
+    def __init__(self, path):
+        self.path = path
+        self.lock = FileLock(f"{path}.lock")
+        self._seen = None
+
+    def load(self):
+        self._seen = _file_id(self.path)
+        return _read_snapshot(self.path)
+
+    def changed(self):
+        return _file_id(self.path) != self._seen
+
+    def changes(self):
+        """Returns (articles, ops): the full contents if another process rewrote the file, else (None, [])."""
+        if self.changed():
+            return self.load(), []
+        return None, []
+
+    def write(self, ops, snapshot):
+        _write_atomic(self.path, json.dumps({"articles": snapshot()}, indent=4))
+        self._seen = _file_id(self.path)
+
+    def position(self):
+        return _position_token(self._seen)
+
+    def close(self, snapshot):
+        pass
+
+
+class JournalBackend:
+    """
+    Appends each operation as one JSON line to a journal next to the snapshot file.
+
+    A write costs O(record size). Once the journal holds `compact_every` operations
+    the current state is written out as a fresh snapshot and the journal is truncated.
+    Startup loads the snapshot and replays the journal on top of it.
+    """
+    def __init__(self, snapshot_path, journal_path=None, compact_every=500):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or f"{os.path.splitext(snapshot_path)[0]}.journal.jsonl"
+        self.compact_every = compact_every
+        self.lock = FileLock(f"{snapshot_path}.lock")
+        self._journal_ops = 0
+        self._offset = 0       # bytes of the journal already applied
+        self._snapshot = None  # _file_id of the snapshot the journal applies to
+
+    def load(self):
+        self._snapshot = _file_id(self.snapshot_path)
+        articles = {article["id"]: article for article in _read_snapshot(self.snapshot_path)}
+        self._journal_ops = 0
+        self._offset = 0
+        for op in self._read_journal():
+            apply_op(articles, op)
+        return list(articles.values())
+
+    def changed(self):
+        return _file_size(self.journal_path) != self._offset or _file_id(self.snapshot_path) != self._snapshot
+
+    def changes(self):
+        """
+        Returns (articles, ops) written by other processes since the last look: the full
+        contents if the journal was compacted meanwhile, otherwise just the new operations.
+        """
+        if _file_id(self.snapshot_path) != self._snapshot or _file_size(self.journal_path) < self._offset:
+            return self.load(), []
+        return None, self._read_journal()
+
+    def position(self):
+        return _position_token(self._snapshot, self._offset)
+
+    def _read_journal(self):
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        ops = []
+        end = data.rfind(b"\n") + 1
+        for n, line in enumerate(data[:end].splitlines(), start=1):
+            if line.strip():
+                try:
+                    ops.append(json.loads(line))
+                except json.JSONDecodeError:
+                    raise RuntimeError(f"{self.journal_path} is corrupt near byte {self._offset}, entry {n}")
+        if end < len(data):
+            # Writers append whole lines under the lock, so a partial line can only be
+            # left by a crash mid-append. Cut it off so the next append starts cleanly.
+            print(f"⚠️ Dropping incomplete last entry in {self.journal_path}")
+            os.truncate(self.journal_path, self._offset + end)
+        self._offset += end
+        self._journal_ops += len(ops)
+        return ops
+
+    def write(self, ops, snapshot):
+        payload = "".join(json.dumps(op) + "\n" for op in ops).encode("utf-8")
+        with open(self.journal_path, "ab") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        self._offset += len(payload)
+        self._journal_ops += len(ops)
+        if self._journal_ops >= self.compact_every:
+            self.compact(snapshot)
+
+    def compact(self, snapshot):
+        """Folds the journal into a new snapshot and starts an empty journal."""
+        _write_atomic(self.snapshot_path, json.dumps({"articles": snapshot()}, indent=4))
+        open(self.journal_path, "w").close()
+        self._snapshot = _file_id(self.snapshot_path)
+        self._offset = 0
+        self._journal_ops = 0
+
+    def close(self, snapshot):
+        if self._journal_ops:
+            self.compact(snapshot)
+
+
+def make_backend(kind, path):
+    """Builds a storage backend by name ("journal" or "snapshot")."""
+    if kind == "journal":
+        return JournalBackend(path)
+    if kind == "snapshot":
+        return SnapshotBackend(path)
+    raise ValueError(f"Unknown storage backend: {kind}")
+
+
+# --- The Store ---
+
+class ArticleStore:
+    """
+    Keeps every article in memory and hands changes to a storage backend in the background.
+
+    Reads are served from dictionaries: lookups by ID are a single dict access, and each
+    (status) and (status, category) list is kept sorted by (created_at, id), so pages are
+    slices found by binary search and a publish or delete moves one key between lists
+    without scanning the archive. Mutations queue an operation and wake a flusher
+    thread, which waits `flush_interval` seconds so a burst of writes reaches the backend
+    as a single batch.
+
+    Several processes may run a store over the same files (uvicorn --workers N). Each flush
+    takes the backend's exclusive file lock, first applies whatever the other processes
+    wrote and only then appends its own operations, so no update is lost. Reads look for
+    other processes' changes at most once every `sync_interval` seconds.
+    """
+    def __init__(self, backend, flush_interval=0.5, sync_interval=0.5):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.sync_interval = sync_interval
+        self._articles = {}  # id -> article
+        # (status, None) and (status, lower-cased category) -> list of (created_at, id), sorted ascending
+        self._lists = {}
+        self._summaries = {}  # id -> summary record, rebuilt whenever the article changes
+        self._search = SearchIndex()  # full-text index over headline + content
+        # What HTTP validators are derived from: the backend position the in-memory contents
+        # were read from, which every worker at that position shares. Local writes not yet
+        # flushed (`_seq` past `_saved_seq`) make the contents this process's own until they are.
+        self._position = None
+        self._instance = uuid.uuid4().hex[:8]
+        self._seq = 0        # local operations recorded
+        self._saved_seq = 0  # ... of which the backend holds all up to here
+        self._claimed_seq = 0
+        self.last_modified = datetime.now(timezone.utc)
+        # _lock guards the in-memory state; _flush_lock serializes all backend access within
+        # this process. Never take _flush_lock or the file lock while holding _lock.
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._pending = []
+        self._last_sync = time.monotonic()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flusher = None
+
+    # --- Lifecycle ---
+
+    def load(self):
+        """Loads all articles from the backend once."""
+        with self._flush_lock, self.backend.lock.hold():
+            articles = self.backend.load()
+            with self._lock:
+                self._reset(articles)
+                self._position = self.backend.position()
+
+    def start(self):
+        """Starts the background flusher thread."""
+        if self._flusher and self._flusher.is_alive():
+            return
+        self._stop.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, name="article-store-flusher", daemon=True)
+        self._flusher.start()
+
+    def close(self):
+        """Stops the flusher, writes out anything still pending and lets the backend tidy up."""
+        self._stop.set()
+        self._wake.set()
+        if self._flusher:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+        with self._flush_lock, self.backend.lock.hold():
+            self._catch_up()
+            self.backend.close(self._snapshot)
+            with self._lock:
+                self._position = self.backend.position()
+                self._saved_seq = self._claimed_seq
+
+    # --- Reads ---
+
+    def get(self, article_id):
+        self.sync()
+        return self._articles.get(article_id)
+
+    def list_by_status(self, status, category=None, limit=None, before=None, summary=False):
+        """
+        Returns articles with the given status, newest first, optionally limited to one category.
+
+        `before` is a (created_at, id) key: only articles that sort strictly before it are
+        returned, which is how the list endpoints page through results. With `summary`
+        the lightweight summary records are returned instead of full articles.
+        """
+        self.sync()
+        records = self._summaries if summary else self._articles
+        with self._lock:
+            keys = self._lists.get((status, category.lower() if category else None), [])
+            end = bisect.bisect_left(keys, tuple(before)) if before else len(keys)
+            start = max(0, end - limit) if limit else 0
+            return [records[article_id] for _, article_id in reversed(keys[start:end])]
+
+    def search(self, query, status="published", limit=20):
+        """Full-text search over headlines and content. Returns summary records with a BM25 `score`, best first."""
+        self.sync()
+        with self._lock:
+            hits = self._search.search(
+                query, limit, accept=lambda article_id: self._articles[article_id].get("status") == status
+            )
+            return [{**self._summaries[article_id], "score": round(score, 4)} for score, article_id in hits]
+
+    def __len__(self):
+        return len(self._articles)
+
+    @property
+    def version(self):
+        """
+        Names the current contents. Processes at the same backend position with nothing
+        left to flush share a version; otherwise it is unique to this process.
+        """
+        with self._lock:
+            if self._seq == self._saved_seq:
+                return self._position
+            return f"{self._position}~{self._instance}.{self._seq:x}"
+
+    def version_info(self):
+        """Returns (version, last_modified) for the current contents."""
+        self.sync()
+        with self._lock:
+            return self.version, self.last_modified
+
+    # --- Writes ---
+
+    def add(self, article):
+        self.add_many([article])
+        return article
+
+    def update(self, article_id, **fields):
+        """Updates fields on an article. Returns False if the ID is unknown."""
+        return self.update_many([article_id], **fields)[article_id]
+
+    def delete(self, article_id):
+        """Removes an article. Returns False if the ID is unknown."""
+        return self.delete_many([article_id])[article_id]
+
+    def add_many(self, articles):
+        """Adds several articles as one batch, so they reach the backend in a single write."""
+        self._record([{"op": "put", "article": dict(article)} for article in articles])
+
+    def update_many(self, article_ids, **fields):
+        """Applies the same field changes to several articles at once. Returns {id: found}."""
+        found = self._existing(article_ids)
+        self._record([{"op": "update", "id": article_id, "fields": fields}
+                      for article_id, exists in found.items() if exists])
+        return found
+
+    def delete_many(self, article_ids):
+        """Removes several articles at once. Returns {id: found}."""
+        found = self._existing(article_ids)
+        self._record([{"op": "delete", "id": article_id} for article_id, exists in found.items() if exists])
+        return found
+
+    def _existing(self, article_ids):
+        if any(article_id not in self._articles for article_id in article_ids):
+            # They may have just been created by another process.
+            self.sync(force=True)
+        return {article_id: article_id in self._articles for article_id in article_ids}
+
+    # --- Persistence ---
+
+    def flush(self):
+        """Hands every queued operation to the backend in one batch."""
+        with self._flush_lock:
+            with self._lock:
+                ops, self._pending = self._pending, []
+                self._claimed_seq = self._seq
+            if not ops:
+                return
+            try:
+                with self.backend.lock.hold():
+                    self._catch_up(ops)
+                    self.backend.write(ops, self._snapshot)
+                    with self._lock:
+                        self._position = self.backend.position()
+                        self._saved_seq = self._claimed_seq
+            except OSError as e:
+                print(f"Error persisting articles: {e}")
+                with self._lock:
+                    self._pending[:0] = ops
+
+    def sync(self, force=False):
+        """Applies changes other processes have written since the last look."""
+        now = time.monotonic()
+        if not force and now - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = now
+        if not self.backend.changed():
+            return
+        # A flush in progress catches up anyway, so readers don't queue behind it.
+        if not self._flush_lock.acquire(blocking=force):
+            return
+        try:
+            with self.backend.lock.hold(shared=True):
+                self._catch_up()
+        finally:
+            self._flush_lock.release()
+
+    def _catch_up(self, unflushed=()):
+        """
+        Folds other processes' changes into memory. Local operations that haven't reached the
+        backend yet are re-applied on top, since they will be written after what was just read.
+        """
+        articles, ops = self.backend.changes()
+        if articles is None and not ops:
+            return
+        with self._lock:
+            if articles is not None:
+                self._reset(articles)
+            for op in ops:
+                self._apply(op)
+            for op in [*unflushed, *self._pending]:
+                self._apply(op)
+            self._position = self.backend.position()
+            self._touch()
+
+    def _snapshot(self):
+        """
+        Current contents for a full rewrite. Operations still queued are part of it, so they
+        are claimed here: appending them later, after other processes' newer changes, would
+        replay them out of order.
+        """
+        with self._lock:
+            self._pending = []
+            self._claimed_seq = self._seq
+            return [dict(article) for article in self._articles.values()]
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            # Give a burst of writes time to land before paying for the write.
+            self._stop.wait(self.flush_interval)
+            self.flush()
+
+    def _record(self, ops):
+        if not ops:
+            return
+        with self._lock:
+            for op in ops:
+                self._apply(op)
+            self._pending.extend(ops)
+            self._seq += 1
+            self._touch()
+        self._wake.set()
+
+    def _touch(self):
+        self.last_modified = datetime.now(timezone.utc)
+
+    # --- Indexes ---
+
+    def _apply(self, op):
+        """Applies one operation to the in-memory state and its indexes."""
+        kind = op["op"]
+        if kind == "put":
+            self._remove(op["article"]["id"])
+            self._index(dict(op["article"]))
+        elif kind == "update":
+            article = self._articles.get(op["id"])
+            if article is not None:
+                self._unindex_lists(article)
+                article.update(op["fields"])
+                self._index_lists(article)
+                if "headline" in op["fields"] or "content" in op["fields"]:
+                    self._search.add(article["id"], article.get("headline"), article.get("content"))
+                if "content" in op["fields"]:
+                    self._summaries[article["id"]] = summarize(article)
+                else:
+                    # Status changes (publish) don't touch the excerpt, so skip re-deriving it.
+                    changed = {name: value for name, value in op["fields"].items() if name in SUMMARY_FIELDS}
+                    self._summaries[article["id"]] = {**self._summaries[article["id"]], **changed}
+        elif kind == "delete":
+            self._remove(op["id"])
+        else:
+            raise ValueError(f"Unknown store operation: {kind}")
+
+    def _reset(self, articles):
+        self._articles.clear()
+        self._lists.clear()
+        self._summaries.clear()
+        self._search.clear()
+        for article in articles:
+            self._index(article)
+
+    def _index(self, article):
+        self._articles[article["id"]] = article
+        self._summaries[article["id"]] = summarize(article)
+        self._search.add(article["id"], article.get("headline"), article.get("content"))
+        self._index_lists(article)
+
+    def _remove(self, article_id):
+        article = self._articles.pop(article_id, None)
+        if article is not None:
+            del self._summaries[article_id]
+            self._search.remove(article_id)
+            self._unindex_lists(article)
+
+    @staticmethod
+    def _list_names(article):
+        status = article.get("status")
+        return [(status, None), (status, (article.get("category") or "").lower())]
+
+    def _index_lists(self, article):
+        key = (article["created_at"], article["id"])
+        for name in self._list_names(article):
+            bisect.insort(self._lists.setdefault(name, []), key)
+
+    def _unindex_lists(self, article):
+        key = (article["created_at"], article["id"])
+        for name in self._list_names(article):
+            keys = self._lists.get(name, [])
+            i = bisect.bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
@@ -0,0 +1,148 @@
+"""
+Hammers one article database from several processes (like uvicorn workers), each with
+several threads, and checks that no create, publish or delete was lost.
+
+    python stress_store.py --backend journal --processes 4 --threads 4 --articles 100
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from store import ArticleStore, make_backend
+from sqlite_store import SqliteArticleStore
+
+
+def open_store(kind, directory, fast=True):
+    if kind == "sqlite":
+        return SqliteArticleStore(os.path.join(directory, "articles.db"))
+    interval = 0.01 if fast else 0.5
+    return ArticleStore(make_backend(kind, os.path.join(directory, "database.json")),
+                        flush_interval=interval, sync_interval=interval)
+
+
+def article_id(process, thread, i):
+    return f"p{process}-t{thread}-{i}"
+
+
+def expected_state(process, thread, i):
+    """What should survive for each article: owners delete every 3rd, neighbours publish i % 4 == 1."""
+    if i % 3 == 0:
+        return None
+    if i % 2 == 0 or i % 4 == 1:
+        return "published"
+    return "draft"
+
+
+def run_thread(store, process, thread, processes, articles, errors):
+    for i in range(articles):
+        store.add({
+            "id": article_id(process, thread, i),
+            "headline": f"Stress headline {process}/{thread}/{i}",
+            "content": "Stress test content. " * 20,
+            "author": "Stress Test",
+            "category": ["Politics", "Sports", "Business"][i % 3],
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "status": "draft",
+        })
+        if i % 2 == 0:
+            store.update(article_id(process, thread, i), status="published")
+        if i % 3 == 0:
+            store.delete(article_id(process, thread, i))
+
+    # Publish some of the next process's articles, which only exist here once its
+    # writes have been flushed and picked up.
+    neighbour = (process + 1) % processes
+    for i in range(1, articles, 4):
+        if i % 3 == 0:
+            continue  # deleted by its owner, possibly before it ever reached us
+        target = article_id(neighbour, thread, i)
+        deadline = time.monotonic() + 30
+        while not store.update(target, status="published"):
+            if time.monotonic() > deadline:
+                errors.append(f"{target} never became visible to process {process}")
+                break
+            time.sleep(0.02)
+
+
+def run_process(kind, directory, process, processes, threads, articles, results):
+    store = open_store(kind, directory)
+    store.load()
+    store.start()
+    errors = []
+    workers = [
+        threading.Thread(target=run_thread, args=(store, process, t, processes, articles, errors))
+        for t in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    store.close()
+    results.put(errors)
+
+
+def verify(kind, directory, processes, threads, articles):
+    store = open_store(kind, directory, fast=False)
+    store.load()
+    problems = []
+    for p in range(processes):
+        for t in range(threads):
+            for i in range(articles):
+                article = store.get(article_id(p, t, i))
+                expected = expected_state(p, t, i)
+                actual = article["status"] if article else None
+                if actual != expected:
+                    problems.append(f"{article_id(p, t, i)}: expected {expected}, found {actual}")
+    store.close()
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=["journal", "snapshot", "sqlite"], default="journal")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--articles", type=int, default=100, help="articles created per thread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.backend == "sqlite":
+            setup = open_store("sqlite", directory)
+            setup.load()
+            setup.close()
+
+        results = multiprocessing.Queue()
+        started = time.perf_counter()
+        procs = [
+            multiprocessing.Process(
+                target=run_process,
+                args=(args.backend, directory, p, args.processes, args.threads, args.articles, results),
+            )
+            for p in range(args.processes)
+        ]
+        for proc in procs:
+            proc.start()
+        errors = [error for _ in procs for error in results.get()]
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - started
+
+        problems = errors + verify(args.backend, directory, args.processes, args.threads, args.articles)
+
+    total = args.processes * args.threads * args.articles
+    print(f"{args.backend}: {total} articles from {args.processes} processes x {args.threads} threads in {elapsed:.2f}s")
+    if problems:
+        print(f"❌ {len(problems)} problems, e.g.:")
+        for problem in problems[:10]:
+            print(f"   {problem}")
+        sys.exit(1)
+    print("✅ No lost updates.")
+
+
+if __name__ == "__main__":
+    main()
@@ -44,7 +44,8 @@ export default function AdminPage() {
     const draftsData = await draftsRes.json();
     setDrafts(draftsData);
 
-    const publishedRes = await fetch('http://127.0.0.1:8000/api/articles');
+    // The published tab only shows headlines and dates, so skip the article bodies
+    const publishedRes = await fetch('http://127.0.0.1:8000/api/articles?view=summary');
     const publishedData = await publishedRes.json();
     setPublished(publishedData);
   };
@@ -62,6 +63,19 @@ export default function AdminPage() {
     setTimeout(() => setMessage(''), 3000);
   };
 
+  const handlePublishAll = async () => {
+    // One batch request for every draft, then a single refetch
+    setMessage('Publishing all drafts...');
+    await fetch('http://127.0.0.1:8000/api/articles:publish', {
+      method: 'PATCH',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ ids: drafts.map((draft) => draft.id) }),
+    });
+    setMessage(`${drafts.length} drafts published successfully!`);
+    fetchData();
+    setTimeout(() => setMessage(''), 3000);
+  };
+
   const handleDeleteClick = (articleId) => {
     // ... (logic remains the same)
     setArticleToDelete(articleId);
@@ -126,6 +140,11 @@ export default function AdminPage() {
         <div>
           {activeTab === 'drafts' && (
             <div className="space-y-6">
+              {drafts.length > 1 && (
+                <div className="flex justify-end">
+                  <button onClick={handlePublishAll} className="px-6 py-2 bg-blue-600 text-white font-semibold rounded-lg hover:bg-blue-700 transition-colors">Publish All Drafts</button>
+                </div>
+              )}
               {drafts.length > 0 ? drafts.map((draft) => (
                 <div key={draft.id} className="bg-white rounded-lg shadow-md border">
                   {/* Clickable Header for Toggling */}
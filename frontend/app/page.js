@@ -1,18 +1,26 @@
 import Link from 'next/link';
 
+// How many stories to show per page
+const PAGE_SIZE = 30;
+
 /**
- * Fetches articles from the API, optionally filtering by category.
+ * Fetches one page of article summaries from the API, optionally filtering by category.
  * @param {string | null} category - The category to filter articles by.
- * @returns {Promise<Array>} A promise that resolves to an array of articles.
+ * @param {string | null} cursor - The cursor of the page to fetch, or null for the first page.
+ * @returns {Promise<{articles: Array, nextCursor: string | null}>} The page and the cursor of the next one.
  */
-async function getArticles(category) {
-  // Base URL for the articles API
-  let url = 'http://127.0.0.1:8000/api/articles';
+async function getArticles(category, cursor) {
+  // Summaries carry a short excerpt instead of the full article body
+  const params = new URLSearchParams({ view: 'summary', limit: String(PAGE_SIZE) });
 
   // If a category is provided, append it as a query parameter
   if (category) {
-    url += `?category=${encodeURIComponent(category)}`;
+    params.set('category', category);
+  }
+  if (cursor) {
+    params.set('cursor', cursor);
   }
+  const url = `http://127.0.0.1:8000/api/articles?${params}`;
 
   // Fetch data with caching disabled to ensure freshness
   const res = await fetch(url, { cache: 'no-store' });
@@ -22,7 +30,7 @@ async function getArticles(category) {
     throw new Error('Failed to fetch articles');
   }
 
-  return res.json();
+  return { articles: await res.json(), nextCursor: res.headers.get('X-Next-Cursor') };
 }
 
 /**
@@ -39,7 +47,7 @@ function ArticleCard({ article }) {
           {article.headline}
         </Link>
       </h3>
-      <p className="text-gray-600 text-sm mb-3 flex-grow">{article.content.substring(0, 120)}...</p>
+      <p className="text-gray-600 text-sm mb-3 flex-grow">{article.excerpt.substring(0, 120)}...</p>
       <small className="text-gray-500">{new Date(article.created_at).toLocaleDateString()}</small>
     </div>
   );
@@ -55,7 +63,8 @@ function ArticleCard({ article }) {
 export default async function Home({ searchParams }) {
   // Get the category from URL query, or null if it doesn't exist
   const category = searchParams.category || null;
-  const articles = await getArticles(category);
+  const cursor = searchParams.cursor || null;
+  const { articles, nextCursor } = await getArticles(category, cursor);
 
   // Separate the first article as the "hero" story
   const heroArticle = articles[0];
@@ -79,7 +88,7 @@ export default async function Home({ searchParams }) {
                 {heroArticle.headline}
               </Link>
             </h2>
-            <p className="text-gray-700 mb-4">{heroArticle.content.substring(0, 250)}...</p>
+            <p className="text-gray-700 mb-4">{heroArticle.excerpt}...</p>
             <small className="text-gray-500">By {heroArticle.author} on {new Date(heroArticle.created_at).toLocaleDateString()}</small>
           </div>
 
@@ -90,6 +99,18 @@ export default async function Home({ searchParams }) {
               <ArticleCard key={article.id} article={article} />
             ))}
           </div>
+
+          {/* Link to the next page of stories */}
+          {nextCursor && (
+            <div className="text-center mt-8">
+              <Link
+                href={`/?${new URLSearchParams({ ...(category ? { category } : {}), cursor: nextCursor })}`}
+                className="text-brand-red font-semibold hover:underline"
+              >
+                Older stories →
+              </Link>
+            </div>
+          )}
         </>
       ) : (
         <p className="text-center text-gray-500 py-16">